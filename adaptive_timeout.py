@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Adaptive Timeout for S.C.O.U.T support runners
+Menentukan budget timeout subprocess berdasarkan latency target dari run sebelumnya
+"""
+
+import os
+import json
+import time
+import logging
+
+class AdaptiveTimeout:
+    """Simpan latency per target (domain/file) dan hitung budget timeout berikutnya
+
+    Latency disimpan sebagai EWMA, baik total durasi maupun durasi per baris
+    input, supaya budget bisa disesuaikan dengan ukuran input. Target yang
+    timeout pada run terakhir dianggap lambat dan bisa ditunda ke pass retry.
+    """
+
+    def __init__(self, state_file: str, default_timeout: float, min_timeout: float, max_timeout: float,
+                 default_per_line: float = None, multiplier: float = 3.0, smoothing: float = 0.3,
+                 retry_backoff: float = 30):
+        self.logger = logging.getLogger(__name__)
+        self.state_file = state_file
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.default_per_line = default_per_line
+        self.multiplier = multiplier
+        self.smoothing = smoothing
+        self.retry_backoff = retry_backoff
+        self._state = None
+        # Key yang diupdate proses ini; worker lain bisa menulis file state yang sama
+        self.updated_keys = set()
+
+    @property
+    def state(self) -> dict:
+        """History latency, baru dibaca dari disk saat pertama kali dipakai"""
+        if self._state is None:
+            self._state = self.load()
+        return self._state
+
+    def load(self) -> dict:
+        """Load history latency dari file state"""
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Error loading latency state {self.state_file}: {e}")
+            return {}
+
+    def save(self):
+        """Simpan history latency secara atomic, digabung dengan state terbaru di disk"""
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        tmp_path = f"{self.state_file}.{os.getpid()}.tmp"
+        try:
+            state = self.load()
+            for key in self.updated_keys:
+                state[key] = self.state[key]
+
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, self.state_file)
+        except Exception as e:
+            self.logger.error(f"Error saving latency state {self.state_file}: {e}")
+
+    def clamp(self, timeout: float) -> float:
+        """Batasi timeout ke rentang min/max"""
+        return max(self.min_timeout, min(self.max_timeout, timeout))
+
+    def get_timeout(self, key: str, line_count: int = None) -> float:
+        """Hitung budget timeout untuk target, opsional berdasarkan jumlah baris input"""
+        entry = self.state.get(key)
+
+        if line_count is not None and self.default_per_line is not None:
+            if entry and entry.get('per_line') is not None:
+                return self.clamp(self.min_timeout + self.multiplier * entry['per_line'] * line_count)
+            return self.clamp(self.min_timeout + self.default_per_line * line_count)
+
+        if entry and entry.get('ewma') is not None:
+            return self.clamp(self.multiplier * entry['ewma'])
+        return self.clamp(self.default_timeout)
+
+    def record(self, key: str, elapsed: float, line_count: int = None, timed_out: bool = False):
+        """Catat durasi satu run; run yang timeout dicatat sebagai batas bawah latency"""
+        entry = self.state.setdefault(key, {'ewma': None, 'per_line': None, 'timeouts': 0})
+
+        if timed_out:
+            # Durasi sebenarnya tidak diketahui, minimal sebesar budget yang habis
+            entry['ewma'] = max(entry['ewma'] or 0, elapsed)
+            if line_count:
+                entry['per_line'] = max(entry['per_line'] or 0, elapsed / line_count)
+            entry['timeouts'] = entry.get('timeouts', 0) + 1
+        else:
+            entry['ewma'] = self.smooth(entry['ewma'], elapsed)
+            if line_count:
+                entry['per_line'] = self.smooth(entry['per_line'], elapsed / line_count)
+            entry['timeouts'] = 0
+
+        entry['last_run'] = int(time.time())
+        self.updated_keys.add(key)
+
+    def smooth(self, previous: float, value: float) -> float:
+        """Exponentially weighted moving average"""
+        if previous is None:
+            return value
+        return self.smoothing * value + (1 - self.smoothing) * previous
+
+    def is_slow(self, key: str) -> bool:
+        """Target dianggap lambat jika run terakhirnya timeout"""
+        entry = self.state.get(key)
+        return bool(entry and entry.get('timeouts', 0) > 0)
+
+    def was_slow(self, key: str) -> bool:
+        """Seperti is_slow, tapi hanya berdasarkan run sebelumnya: key yang sudah
+        dicatat ulang oleh proses ini tidak dianggap lambat"""
+        return key not in self.updated_keys and self.is_slow(key)
+    
+    def get_retry_timeout(self, key: str, attempt: int, line_count: int = None) -> float:
+        """Budget untuk retry ke-N, naik dua kali lipat setiap percobaan"""
+        return self.clamp(self.get_timeout(key, line_count) * (2 ** attempt))
+
+    def get_retry_delay(self, attempt: int) -> float:
+        """Delay exponential backoff sebelum retry ke-N (retry pertama tanpa delay)"""
+        if attempt == 0:
+            return 0
+        return self.retry_backoff * (2 ** (attempt - 1))
+
+def decode_partial_output(output) -> str:
+    """Ambil stdout parsial dari TimeoutExpired (bisa bytes, str, atau None)"""
+    if output is None:
+        return ""
+    if isinstance(output, bytes):
+        return output.decode('utf-8', errors='replace')
+    return output
@@ -6,20 +6,37 @@ Web interface for viewing bug bounty program and subdomain data
 
 import os
 import sys
+import json
+import argparse
+import threading
 
-# Add scout project directory to path for imports
-scout_project_path = os.path.join(os.path.dirname(__file__), '..', 'scout')
-sys.path.append(scout_project_path)
+from flask import Flask, render_template, jsonify, request
 
-from flask import Flask, render_template, jsonify
-from src.db import Database
+from scan_generations import ensure_generation_tables
+
+# Scout project directory, added to sys.path only when the database is needed
+SCOUT_PROJECT_PATH = os.path.join(os.path.dirname(__file__), '..', 'scout')
 
 app = Flask(__name__, template_folder='templates')
 
+# Subdomains newer than this many seconds are held back until the next poll,
+# so rows from transactions still in flight are not skipped by the cursor
+CHANGES_SETTLE_SECONDS = 60
+
+# MySQL error raised by CREATE INDEX when another process created the index first
+ER_DUP_KEYNAME = 1061
+
+def get_database():
+    """Create a scout Database, importing src.db on first use"""
+    if SCOUT_PROJECT_PATH not in sys.path:
+        sys.path.append(SCOUT_PROJECT_PATH)
+    from src.db import Database
+    return Database(config_path=os.path.join(SCOUT_PROJECT_PATH, 'config.json'))
+
 def get_database_data():
     """Fetch data from database"""
     try:
-        db = Database(config_path=os.path.join(os.path.dirname(__file__), '..', 'scout', 'config.json'))
+        db = get_database()
         if not db.connect():
             return None, None
         
@@ -48,7 +65,7 @@ def get_database_data():
 def get_program_subdomains(program_name):
     """Get subdomains related to a specific program"""
     try:
-        db = Database(config_path=os.path.join(os.path.dirname(__file__), '..', 'scout', 'config.json'))
+        db = get_database()
         if not db.connect():
             return []
         
@@ -76,11 +93,84 @@ def index():
                          programs=programs or [],
                          subdomains=subdomains or [])
 
+@app.route('/api/changes')
+def api_changes():
+    """API endpoint for new subdomains and new httpx results since a cursor
+    
+    Without `since` only the current cursor is returned, so clients start
+    polling from "now" instead of downloading the whole dataset.
+    
+    The subdomain half of the cursor trails the database clock by
+    CHANGES_SETTLE_SECONDS: subdomains are keyed on `first_seen`, which is
+    not monotonic in commit order, so a row is only handed out once any
+    transaction that could still insert an older `first_seen` has committed.
+    Rows from a transaction that stays open longer than that can still be
+    missed. The generation half uses MAX(id), which is safe because
+    generations are written under a lock and commit in id order.
+    """
+    since = request.args.get('since')
+    parsed_cursor = None
+    if since:
+        parsed_cursor = parse_changes_cursor(since)
+        if parsed_cursor is None:
+            return jsonify({"error": "Invalid cursor, expected <timestamp>-<generation>"}), 400
+    
+    try:
+        db = get_database()
+        if not db.connect():
+            return jsonify({"error": "Database connection failed"}), 500
+        
+        # Snapshot the head first so rows written mid-request land in the next poll
+        head_timestamp = db.execute_query(
+            "SELECT UNIX_TIMESTAMP(NOW()) - %s as ts", (CHANGES_SETTLE_SECONDS,)
+        )[0]['ts']
+        head_generation = db.execute_query(
+            "SELECT COALESCE(MAX(id), 0) as id FROM httpx_generations"
+        )[0]['id']
+        head_timestamp = int(head_timestamp)
+        
+        subdomains = []
+        httpx_changes = []
+        if parsed_cursor:
+            since_timestamp, since_generation = parsed_cursor
+            
+            if head_timestamp > since_timestamp:
+                subdomains = db.execute_query("""
+                    SELECT subdomain, source, first_seen, last_seen, is_new
+                    FROM subdomains
+                    WHERE first_seen > FROM_UNIXTIME(%s) AND first_seen <= FROM_UNIXTIME(%s)
+                    ORDER BY first_seen
+                """, (since_timestamp, head_timestamp)) or []
+            
+            if head_generation > since_generation:
+                httpx_changes = db.execute_query("""
+                    SELECT c.generation_id, g.program, c.url, c.status_code, c.title, c.tech,
+                           g.created_at
+                    FROM httpx_changes c
+                    JOIN httpx_generations g ON g.id = c.generation_id
+                    WHERE c.generation_id > %s AND c.generation_id <= %s
+                    ORDER BY c.generation_id, c.id
+                """, (since_generation, head_generation)) or []
+            
+            head_timestamp = max(head_timestamp, since_timestamp)
+            head_generation = max(head_generation, since_generation)
+        
+        db.disconnect()
+        
+        return jsonify({
+            "cursor": f"{head_timestamp}-{head_generation}",
+            "subdomains": subdomains,
+            "httpx": httpx_changes
+        })
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/program/<program_name>')
 def program_detail(program_name):
     """Program detail page showing subdomains"""
     try:
-        db = Database(config_path=os.path.join(os.path.dirname(__file__), '..', 'scout', 'config.json'))
+        db = get_database()
         if not db.connect():
             return "Database connection failed", 500
         
@@ -129,7 +219,7 @@ def api_program_subdomains(program_name):
 def api_stats():
     """API endpoint for statistics"""
     try:
-        db = Database(config_path=os.path.join(os.path.dirname(__file__), '..', 'scout', 'config.json'))
+        db = get_database()
         if not db.connect():
             return jsonify({"error": "Database connection failed"})
         
@@ -165,63 +255,238 @@ def api_stats():
     except Exception as e:
         return jsonify({"error": str(e)})
         
-def get_httpx_results():
-    """Get all httpx scan results from scans/httpx directory"""
-    httpx_results = []
+# Parsed httpx files keyed by filename: (mtime, size, results)
+_httpx_cache = {}
+_httpx_cache_lock = threading.Lock()
+
+def parse_httpx_file(filepath, filename):
+    """Parse a single httpx output file into result dicts"""
+    results = []
+    program_name = filename.replace('-httpx.txt', '')
+    
+    # Parse httpx output format: https://example.com [200] [1234] [Title] [Tech]
+    rows = []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('URL'):
+                parts = [part.replace(']', '').strip() for part in line.split(' [')]
+                if len(parts) >= 3:
+                    rows.append(parts)
+    
+    # Older result files were written without -cl, and a numeric title like
+    # [404] looks the same as a content length. run-httpx.py writes a
+    # fingerprint store next to every file it produces with -cl, so that
+    # store tells the two formats apart.
+    fingerprint_path = os.path.join(os.path.dirname(filepath), '.fingerprints', f"{program_name}.json")
+    has_content_length = os.path.exists(fingerprint_path)
+    
+    for parts in rows:
+        content_length = None
+        fields = parts[2:]
+        if has_content_length and fields[0].isdigit():
+            content_length = int(fields[0])
+            fields = fields[1:]
+        elif has_content_length and fields[0] == '' and len(fields) > 1:
+            # Lines carried over from an older file have an empty content length
+            fields = fields[1:]
+        
+        url = parts[0]
+        status_code = parts[1]
+        title = fields[0] if len(fields) > 0 else ""
+        tech = fields[1] if len(fields) > 1 else ""
+        
+        results.append({
+            'program': program_name,
+            'url': url,
+            'status_code': status_code,
+            'content_length': content_length,
+            'title': title,
+            'tech': tech,
+            'tech_list': [t.strip() for t in tech.split(',') if t.strip()],
+            'source_file': filename
+        })
+    
+    return results
+
+class HttpxView:
+    """Precomputed view over httpx results with facet indexes
+    
+    Indexes map program, status code and individual technology to the set of
+    positions in `results`, so filtering is a set intersection instead of a
+    scan over every row. Technologies are indexed case-insensitively and
+    reported under the first spelling seen (`tech_names`).
+    """
+    
+    def __init__(self, results):
+        self.results = results
+        self.by_program = {}
+        self.program_index = {}
+        self.status_index = {}
+        self.tech_index = {}
+        self.tech_names = {}
+        
+        for position, result in enumerate(results):
+            self.by_program.setdefault(result['program'], []).append(result)
+            self.program_index.setdefault(result['program'], set()).add(position)
+            self.status_index.setdefault(result['status_code'], set()).add(position)
+            for tech in result['tech_list']:
+                key = tech.lower()
+                self.tech_index.setdefault(key, set()).add(position)
+                self.tech_names.setdefault(key, tech)
+    
+    def filter(self, status_codes=None, techs=None, program=None):
+        """Return results matching any of status_codes, all of techs and program"""
+        candidate_sets = []
+        
+        if program is not None:
+            candidate_sets.append(self.program_index.get(program, set()))
+        
+        if status_codes:
+            matched = set()
+            for status_code in status_codes:
+                matched |= self.status_index.get(status_code, set())
+            candidate_sets.append(matched)
+        
+        for tech in techs or []:
+            candidate_sets.append(self.tech_index.get(tech.lower(), set()))
+        
+        if not candidate_sets:
+            return list(self.results)
+        
+        # Intersect starting from the smallest set
+        candidate_sets.sort(key=len)
+        positions = set(candidate_sets[0])
+        for candidates in candidate_sets[1:]:
+            positions &= candidates
+            if not positions:
+                break
+        
+        return [self.results[position] for position in sorted(positions)]
+
+# Current HttpxView and the file signature it was built from
+_httpx_view = (None, HttpxView([]))
+
+def get_httpx_view():
+    """Get the precomputed httpx view from scans/httpx directory
+    
+    Files are only re-parsed when their mtime or size changes, and the view
+    is only rebuilt when any file changed.
+    """
+    global _httpx_view
     httpx_dir = os.path.join(os.path.dirname(__file__), 'scans', 'httpx')
     
     if not os.path.exists(httpx_dir):
-        return httpx_results
+        return HttpxView([])
     
     try:
-        for filename in os.listdir(httpx_dir):
+        signature = []
+        file_results = []
+        for filename in sorted(os.listdir(httpx_dir)):
             if filename.endswith('-httpx.txt'):
                 filepath = os.path.join(httpx_dir, filename)
-                program_name = filename.replace('-httpx.txt', '')
+                stat = os.stat(filepath)
+                signature.append((filename, stat.st_mtime, stat.st_size))
                 
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    for line in lines:
-                        line = line.strip()
-                        if line and not line.startswith('URL'):
-                            # Parse httpx output format: https://example.com [200] [Title] [Tech]
-                            parts = line.split(' [')
-                            if len(parts) >= 3:
-                                url = parts[0].strip()
-                                status_code = parts[1].replace(']', '').strip()
-                                title = parts[2].replace(']', '').strip()
-                                tech = parts[3].replace(']', '').strip() if len(parts) > 3 else ""
-                                
-                                httpx_results.append({
-                                    'program': program_name,
-                                    'url': url,
-                                    'status_code': status_code,
-                                    'title': title,
-                                    'tech': tech,
-                                    'source_file': filename
-                                })
-        
-        return httpx_results
+                with _httpx_cache_lock:
+                    cached = _httpx_cache.get(filename)
+                
+                if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+                    results = cached[2]
+                else:
+                    results = parse_httpx_file(filepath, filename)
+                    with _httpx_cache_lock:
+                        _httpx_cache[filename] = (stat.st_mtime, stat.st_size, results)
+                
+                file_results.append(results)
+        
+        signature = tuple(signature)
+        seen_files = {entry[0] for entry in signature}
+        
+        with _httpx_cache_lock:
+            # Forget files that were removed from disk
+            for filename in list(_httpx_cache):
+                if filename not in seen_files:
+                    del _httpx_cache[filename]
+            
+            if _httpx_view[0] == signature:
+                return _httpx_view[1]
+        
+        view = HttpxView([result for results in file_results for result in results])
+        with _httpx_cache_lock:
+            _httpx_view = (signature, view)
+        return view
     except Exception as e:
         print(f"Error reading httpx results: {e}")
-        return []
+        return HttpxView([])
+
+def get_httpx_results():
+    """Get all httpx scan results from scans/httpx directory"""
+    return get_httpx_view().results
+
+def ensure_changes_schema(db):
+    """Create the scan generation tables and the subdomains.first_seen index if missing.
+    
+    Runs once at startup, never inside a request: building the index on a
+    large subdomains table can take a while.
+    """
+    cursor = db.connection.cursor()
+    try:
+        ensure_generation_tables(cursor)
+        cursor.execute("SHOW INDEX FROM subdomains WHERE Column_name = 'first_seen' AND Seq_in_index = 1")
+        if not cursor.fetchall():
+            try:
+                cursor.execute("CREATE INDEX idx_subdomains_first_seen ON subdomains (first_seen)")
+            except Exception as e:
+                # Another dashboard process created it in the meantime
+                if getattr(e, 'errno', None) != ER_DUP_KEYNAME:
+                    raise
+        db.connection.commit()
+    finally:
+        cursor.close()
+
+def prepare_database():
+    """Startup migration: create the schema behind /api/changes before serving"""
+    db = get_database()
+    if not db.connect():
+        print("⚠️  Startup: database connection failed, /api/changes may not work")
+        return
+    try:
+        print("🛠️  Startup: preparing changes schema...")
+        ensure_changes_schema(db)
+    except Exception as e:
+        print(f"⚠️  Startup: could not prepare changes schema: {e}")
+    finally:
+        db.disconnect()
+
+def parse_changes_cursor(cursor_value):
+    """Parse a "<first_seen unix ts>-<generation id>" cursor, None if invalid"""
+    try:
+        timestamp, generation = cursor_value.split('-', 1)
+        return int(timestamp), int(generation)
+    except (AttributeError, ValueError):
+        return None
+
+def warm_up():
+    """Preload caches so the first requests don't pay the parsing cost"""
+    results = get_httpx_results()
+    print(f"🔥 Warm-up: loaded {len(results)} httpx results")
+    
+    db = get_database()
+    if db.connect():
+        db.disconnect()
+        print("🔥 Warm-up: database connection OK")
+    else:
+        print("⚠️  Warm-up: database connection failed")
 
 @app.route('/httpx')
 def httpx_results():
     """Page showing all httpx scan results"""
-    results = get_httpx_results()
-    
-    # Group results by program
-    programs_results = {}
-    for result in results:
-        program = result['program']
-        if program not in programs_results:
-            programs_results[program] = []
-        programs_results[program].append(result)
+    view = get_httpx_view()
     
     return render_template('httpx_results.html',
-                         programs_results=programs_results,
-                         total_results=len(results))
+                         programs_results=view.by_program,
+                         total_results=len(view.results))
 
 @app.route('/api/httpx')
 def api_httpx():
@@ -229,13 +494,47 @@ def api_httpx():
     results = get_httpx_results()
     return jsonify(results)
 
+def get_httpx_changes():
+    """Get the latest change set of every httpx result file"""
+    changes = []
+    httpx_dir = os.path.join(os.path.dirname(__file__), 'scans', 'httpx')
+    
+    if not os.path.exists(httpx_dir):
+        return changes
+    
+    try:
+        for filename in sorted(os.listdir(httpx_dir)):
+            if filename.endswith('-changes.json'):
+                with open(os.path.join(httpx_dir, filename), 'r', encoding='utf-8') as f:
+                    change_set = json.load(f)
+                change_set['program'] = filename.replace('-changes.json', '')
+                changes.append(change_set)
+        return changes
+    except Exception as e:
+        print(f"Error reading httpx changes: {e}")
+        return []
+
+@app.route('/httpx/changes')
+def httpx_changes():
+    """Page showing what changed in the latest httpx run of each program"""
+    changes = get_httpx_changes()
+    
+    # Only programs with at least one change are worth showing
+    changed_programs = [c for c in changes if c['added'] or c['changed'] or c['removed']]
+    
+    return render_template('httpx_changes.html',
+                         changes=changed_programs,
+                         total_programs=len(changes))
+
+@app.route('/api/httpx/changes')
+def api_httpx_changes():
+    """API endpoint for httpx change sets"""
+    return jsonify(get_httpx_changes())
+
 @app.route('/httpx/<program_name>')
 def httpx_program_detail(program_name):
     """Page showing httpx scan results for specific program"""
-    results = get_httpx_results()
-    
-    # Filter results for specific program
-    program_results = [result for result in results if result['program'] == program_name]
+    program_results = get_httpx_view().by_program.get(program_name, [])
     
     return render_template('httpx_program_detail.html',
                          program_name=program_name,
@@ -245,52 +544,110 @@ def httpx_program_detail(program_name):
 @app.route('/api/httpx/<program_name>')
 def api_httpx_program(program_name):
     """API endpoint for program-specific httpx results"""
-    results = get_httpx_results()
-    program_results = [result for result in results if result['program'] == program_name]
+    program_results = get_httpx_view().by_program.get(program_name, [])
     return jsonify(program_results)
 
-@app.route('/api/httpx/stats')
-def api_httpx_stats():
-    """API endpoint for httpx statistics"""
-    results = get_httpx_results()
+@app.route('/api/httpx/filter')
+def api_httpx_filter():
+    """API endpoint for faceted httpx filtering
     
-    if not results:
-        return jsonify({"error": "No httpx results found"})
+    Example: /api/httpx/filter?status=200&tech=Jenkins
+    Multiple `status` values match any of them, multiple `tech` values must all match.
+    """
+    view = get_httpx_view()
+    results = view.filter(status_codes=request.args.getlist('status'),
+                          techs=request.args.getlist('tech'),
+                          program=request.args.get('program'))
     
-    # Calculate statistics
+    # Facet counts within the matched results
     status_codes = {}
     tech_count = {}
-    program_count = {}
-    
     for result in results:
-        # Status code stats
-        status_code = result['status_code']
-        status_codes[status_code] = status_codes.get(status_code, 0) + 1
-        
-        # Technology stats
-        tech = result['tech']
-        if tech:
-            tech_count[tech] = tech_count.get(tech, 0) + 1
-        
-        # Program stats
-        program = result['program']
-        program_count[program] = program_count.get(program, 0) + 1
+        status_codes[result['status_code']] = status_codes.get(result['status_code'], 0) + 1
+        for name in {view.tech_names[tech.lower()] for tech in result['tech_list']}:
+            tech_count[name] = tech_count.get(name, 0) + 1
     
-    stats = {
+    return jsonify({
         "total_urls": len(results),
-        "status_codes": status_codes,
-        "technologies": tech_count,
-        "programs": program_count,
-        "unique_programs": len(program_count)
+        "facets": {
+            "status_codes": status_codes,
+            "technologies": tech_count
+        },
+        "results": results
+    })
+
+@app.route('/api/httpx/stats')
+def api_httpx_stats():
+    """API endpoint for httpx statistics"""
+    view = get_httpx_view()
+    
+    if not view.results:
+        return jsonify({"error": "No httpx results found"})
+    
+    # Counts come straight from the facet indexes
+    stats = {
+        "total_urls": len(view.results),
+        "status_codes": {status: len(positions) for status, positions in view.status_index.items()},
+        "technologies": {view.tech_names[key]: len(positions) for key, positions in view.tech_index.items()},
+        "programs": {program: len(results) for program, results in view.by_program.items()},
+        "unique_programs": len(view.by_program)
     }
     
     return jsonify(stats)
 
+def run_production(host, port, workers, threads):
+    """Serve the dashboard with gunicorn using multiple threaded workers"""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("❌ gunicorn is not installed. Install with: pip3 install -r requirements.txt")
+        sys.exit(1)
+    
+    class DashboardApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f"{host}:{port}")
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+            # Load (and warm up) the app once in the master, workers inherit the caches
+            self.cfg.set('preload_app', True)
+        
+        def load(self):
+            warm_up()
+            return app
+    
+    DashboardApplication().run()
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="S.C.O.U.T Web Dashboard")
+    parser.add_argument('--production', action='store_true',
+                        help='Serve with gunicorn (multi-worker, threaded) instead of the Flask dev server')
+    parser.add_argument('--host', default='0.0.0.0', help='Bind address (default: 0.0.0.0)')
+    parser.add_argument('--port', type=int, default=5000, help='Bind port (default: 5000)')
+    # Every worker process keeps its own copy of the parsed httpx results and
+    # indexes and re-parses changed files on its own, so memory grows with the
+    # worker count. Concurrency comes mostly from threads instead.
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Number of worker processes in production mode; each one holds its own '
+                             'copy of the httpx results in memory (default: 2)')
+    parser.add_argument('--threads', type=int, default=8,
+                        help='Threads per worker in production mode (default: 8)')
+    return parser.parse_args()
+
 if __name__ == '__main__':
+    args = parse_args()
+    
     print("🚀 Starting S.C.O.U.T Web Dashboard...")
-    print("📊 Dashboard available at: http://localhost:5000")
+    print(f"📊 Dashboard available at: http://localhost:{args.port}")
     print("🔍 Program detail pages available at: /program/<program_name>")
     print("🔬 HTTPX results available at: /httpx")
     print("🛑 Press Ctrl+C to stop the server")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    prepare_database()
+    
+    if args.production:
+        print(f"⚙️  Production mode: {args.workers} workers x {args.threads} threads")
+        run_production(args.host, args.port, args.workers, args.threads)
+    else:
+        app.run(debug=True, host=args.host, port=args.port)
\ No newline at end of file
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Load Test for S.C.O.U.T Web Dashboard
+Mengukur requests/sec dan latency (p50/p99) untuk endpoint dashboard, opsional
+sambil endpoint berat lain (mis. /httpx) terus dibebani di background
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DEFAULT_ENDPOINTS = ['/', '/api/stats', '/api/httpx']
+# Endpoint yang diukur di mode mixed (--busy) jika --endpoint tidak diberikan
+DEFAULT_MIXED_ENDPOINTS = ['/api/stats']
+
+def percentile(values: list, pct: float) -> float:
+    """Hitung percentile dari list yang sudah terurut"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+def run_endpoint(base_url: str, endpoint: str, total_requests: int, concurrency: int, timeout: float) -> dict:
+    """Kirim total_requests ke satu endpoint dengan concurrency tertentu"""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    local = threading.local()
+    url = base_url.rstrip('/') + endpoint
+
+    def worker(_):
+        nonlocal errors
+        # Satu session per thread supaya koneksi di-reuse
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            response = local.session.get(url, timeout=timeout)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(total_requests)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'endpoint': endpoint,
+        'requests': total_requests,
+        'errors': errors,
+        'rps': (len(latencies) / duration) if duration else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+def run_busy(base_url: str, endpoint: str, concurrency: int, timeout: float, stop: threading.Event) -> dict:
+    """Bebani endpoint terus-menerus dari beberapa thread sampai stop di-set.
+    
+    Return dict statistik yang diisi thread background; baca setelah
+    semua thread di-join.
+    """
+    stats = {'endpoint': endpoint, 'requests': 0, 'errors': 0, 'threads': []}
+    lock = threading.Lock()
+    url = base_url.rstrip('/') + endpoint
+    
+    def worker():
+        session = requests.Session()
+        while not stop.is_set():
+            try:
+                ok = session.get(url, timeout=timeout).status_code == 200
+            except requests.RequestException:
+                ok = False
+            with lock:
+                stats['requests'] += 1
+                if not ok:
+                    stats['errors'] += 1
+    
+    for _ in range(concurrency):
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        stats['threads'].append(thread)
+    return stats
+
+def get_label(result: dict) -> str:
+    """Label hasil di report/baseline; hasil mode mixed diberi nama endpoint yang dibebani"""
+    if result.get('busy'):
+        return f"{result['endpoint']} (busy {result['busy']})"
+    return result['endpoint']
+
+def print_report(results: list, baseline: dict = None):
+    """Tampilkan hasil dalam bentuk tabel, dengan perbandingan baseline jika ada"""
+    width = max([16] + [len(get_label(result)) for result in results])
+    header = f"{'endpoint':<{width}} {'req':>6} {'err':>5} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}"
+    if baseline:
+        header += f" {'Δ req/s':>9} {'Δ p99':>9}"
+    print(header)
+    print('-' * len(header))
+
+    for result in results:
+        line = (f"{get_label(result):<{width}} {result['requests']:>6} {result['errors']:>5} "
+                f"{result['rps']:>9.1f} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f}")
+        before = baseline.get(get_label(result)) if baseline else None
+        if before:
+            line += (f" {result['rps'] - before['rps']:>+9.1f}"
+                     f" {result['p99_ms'] - before['p99_ms']:>+9.1f}")
+        print(line)
+
+def parse_args():
+    """Parse argument command line"""
+    parser = argparse.ArgumentParser(description="Load test untuk S.C.O.U.T Web Dashboard")
+    parser.add_argument('--url', default='http://localhost:5000', help='Base URL dashboard (default: http://localhost:5000)')
+    parser.add_argument('--endpoint', action='append', dest='endpoints',
+                        help='Endpoint yang di-test, bisa diulang (default: /, /api/stats, /api/httpx; '
+                             'dengan --busy: /api/stats)')
+    parser.add_argument('-n', '--requests', type=int, default=200, help='Jumlah request per endpoint (default: 200)')
+    parser.add_argument('-c', '--concurrency', type=int, default=16, help='Jumlah request paralel (default: 16)')
+    parser.add_argument('--timeout', type=float, default=30, help='Timeout per request dalam detik (default: 30)')
+    parser.add_argument('--busy',
+                        help='Mode mixed: bebani endpoint ini (mis. /httpx) terus-menerus selama pengukuran')
+    parser.add_argument('--busy-concurrency', type=int, default=8,
+                        help='Jumlah thread yang membebani endpoint --busy (default: 8)')
+    parser.add_argument('--save', help='Simpan hasil ke file JSON (mis. before.json)')
+    parser.add_argument('--compare', help='Bandingkan dengan hasil JSON sebelumnya')
+    return parser.parse_args()
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+    endpoints = args.endpoints or (DEFAULT_MIXED_ENDPOINTS if args.busy else DEFAULT_ENDPOINTS)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = {get_label(result): result for result in json.load(f)}
+
+    try:
+        # Satu request awal per endpoint supaya cache server sudah terisi
+        for endpoint in endpoints + ([args.busy] if args.busy else []):
+            requests.get(args.url.rstrip('/') + endpoint, timeout=args.timeout)
+    except requests.RequestException as e:
+        print(f"Dashboard not reachable at {args.url}: {e}")
+        sys.exit(1)
+
+    busy = None
+    stop = threading.Event()
+    if args.busy:
+        # Endpoint berat dibebani dulu supaya pengukuran berjalan saat server sudah sibuk
+        busy = run_busy(args.url, args.busy, args.busy_concurrency, args.timeout, stop)
+        time.sleep(1)
+    
+    try:
+        results = [
+            run_endpoint(args.url, endpoint, args.requests, args.concurrency, args.timeout)
+            for endpoint in endpoints
+        ]
+    finally:
+        stop.set()
+        if busy:
+            for thread in busy['threads']:
+                thread.join()
+    
+    if busy:
+        for result in results:
+            result['busy'] = args.busy
+    print_report(results, baseline)
+    if busy:
+        print(f"Background load on {args.busy}: {busy['requests']} requests, {busy['errors']} errors")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.save}")
+
+if __name__ == "__main__":
+    main()
@@ -9,79 +9,487 @@ import os
 import sys
 import logging
 import re
+import gzip
+import time
+import shutil
+import hashlib
+import argparse
 from datetime import datetime
 from urllib.parse import urlparse, parse_qs, unquote
 
-# Add scout project directory to path for imports
-scout_project_path = os.path.join(os.path.dirname(__file__), '..', 'scout')
-sys.path.append(scout_project_path)
+from adaptive_timeout import AdaptiveTimeout, decode_partial_output
+from runner_common import load_database, setup_logging, read_input_lines
 
-from src.db import Database
+# Domain platform bug bounty: program_url yang mengarah ke sini bukan target scan
+PLATFORM_DOMAINS = (
+    'hackerone.com',
+    'bugcrowd.com',
+    'intigriti.com',
+    'yeswehack.com',
+    'immunefi.com',
+    'hackenproof.com',
+    'openbugbounty.org',
+    'federacy.com',
+)
 
-def setup_logging():
-    """Setup basic logging configuration"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('scout.log'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+# Ekstensi file yang sering lolos sebagai "domain" saat parsing teks scope
+NON_DOMAIN_SUFFIXES = (
+    'html', 'htm', 'php', 'asp', 'aspx', 'jsp', 'js', 'json', 'xml',
+    'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'svg', 'css', 'md', 'zip',
+)
+
+HOSTNAME = r'(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}'
+# Satu entry scope utuh: host, wildcard (*.example.com) atau URL (tanpa scheme/path/port)
+HOST_ENTRY_PATTERN = re.compile(rf'(?:\*\.)?({HOSTNAME})\.?', re.IGNORECASE)
+# Target di dalam kalimat: hanya URL dengan scheme atau wildcard yang diambil
+EMBEDDED_TARGET_PATTERN = re.compile(
+    rf'(?:\b[a-z][a-z0-9+.-]*://|(?<![\w.@-])\*\.)({HOSTNAME})\b',
+    re.IGNORECASE
+)
+SCOPE_SEPARATOR_PATTERN = re.compile(r'[\r\n,;|]+')
+OUT_OF_SCOPE_PATTERN = re.compile(r'out[\s_-]*of[\s_-]*scope', re.IGNORECASE)
+# Ikut di-hash bersama scope: naikkan setiap kali aturan parsing scope berubah
+# supaya target yang tersimpan di program_targets dihitung ulang
+SCOPE_PARSER_VERSION = 2
+
+class GAUCache:
+    """Cache hasil gau di disk (gzip) per domain + flags, dengan TTL dan LRU eviction"""
+    
+    def __init__(self, cache_dir: str = "scans/.cache/gau", ttl_hours: float = 24, max_size_mb: float = 1024):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir
+        self.ttl = ttl_hours * 3600
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        # Eviction menghapus sampai ukuran cache turun ke batas ini, supaya tidak
+        # perlu scan direktori lagi pada setiap write berikutnya
+        self.evict_target = int(self.max_size * 0.9)
+        # Perkiraan total ukuran cache; dihitung dari disk saat write pertama
+        self.total_size = None
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def get_cache_path(self, domain: str, flags: list) -> str:
+        """Path file cache untuk kombinasi domain + gau flags"""
+        key = hashlib.sha256(f"{domain}\0{' '.join(flags)}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.txt.gz")
+    
+    def get(self, domain: str, flags: list):
+        """Ambil URL dari cache; return None jika tidak ada atau sudah expired"""
+        path = self.get_cache_path(domain, flags)
+        try:
+            stat = os.stat(path)
+            if time.time() - stat.st_mtime > self.ttl:
+                self.misses += 1
+                return None
+            
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                urls = [line.rstrip('\n') for line in f if line.strip()]
+            
+            # atime dipakai sebagai penanda LRU, mtime tetap waktu fetch untuk TTL
+            os.utime(path, (time.time(), stat.st_mtime))
+            self.hits += 1
+            self.logger.info(f"GAU cache hit for {domain}: {len(urls)} URLs")
+            return urls
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            self.logger.warning(f"Error reading GAU cache for {domain}: {e}")
+            self.misses += 1
+            return None
+    
+    def set(self, domain: str, flags: list, urls: list):
+        """Simpan URL ke cache; eviction hanya jalan jika total ukuran melewati batas"""
+        path = self.get_cache_path(domain, flags)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            old_size = os.stat(path).st_size if os.path.exists(path) else 0
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                for url in urls:
+                    f.write(url + '\n')
+            new_size = os.stat(tmp_path).st_size
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.logger.warning(f"Error writing GAU cache for {domain}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        
+        if self.total_size is None:
+            # Scan direktori sekali per run (sekaligus membuang entry expired)
+            self.evict()
+            return
+        
+        self.total_size += new_size - old_size
+        if self.total_size > self.max_size:
+            self.evict()
+    
+    def evict(self):
+        """Hapus entry expired, lalu entry paling lama tidak dipakai sampai di bawah batas ukuran.
+        
+        Total ukuran dihitung ulang dari disk, jadi write dari worker lain yang
+        berbagi direktori cache ikut terhitung.
+        """
+        now = time.time()
+        entries = []
+        total_size = 0
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith('.txt.gz'):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(path)
+                if now - stat.st_mtime > self.ttl:
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+            total_size += stat.st_size
+        
+        if total_size > self.max_size:
+            entries.sort()
+            for _, size, path in entries:
+                if total_size <= self.evict_target:
+                    break
+                try:
+                    os.remove(path)
+                    total_size -= size
+                except FileNotFoundError:
+                    pass
+        
+        self.total_size = total_size
+    
+    def summary(self) -> str:
+        """Ringkasan hit/miss untuk log akhir run"""
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total else 0
+        return f"GAU cache: {self.hits} hits, {self.misses} misses ({hit_rate:.1f}% hit rate)"
 
 class GAURunner:
     """GAU tool runner untuk scan semua domain dari database"""
     
-    def __init__(self, output_dir: str = "scans/gau"):
+    def __init__(self, output_dir: str = "scans/gau", cache: GAUCache = None, refresh: bool = False,
+                 max_retries: int = 2, retry_backoff: float = 30, top_k: int = 1):
         self.logger = logging.getLogger(__name__)
         self.output_dir = output_dir
-        os.makedirs(self.output_dir, exist_ok=True)
-        self.db = Database(config_path=os.path.join(os.path.dirname(__file__), '..', 'scout', 'config.json'))
+        self.cache = cache
+        self.refresh = refresh
+        self.gau_flags = []
+        # Jumlah URL representatif yang disimpan per group similar URLs
+        self.top_k = max(1, top_k)
+        self.max_retries = max_retries
+        self.timeouts = AdaptiveTimeout(
+            state_file=os.path.join('scans', '.state', 'gau-latency.json'),
+            default_timeout=300,
+            min_timeout=60,
+            max_timeout=1800,
+            retry_backoff=retry_backoff
+        )
+        # URL parsial dari gau yang timeout, dipakai jika semua retry gagal
+        self.partial_results = {}
+        # Alasan percobaan terakhir gagal per domain: 'deferred', 'timeout' atau 'failed'
+        self.last_failure = {}
+        self._db = None
     
+    @property
+    def db(self):
+        """Database scout, baru di-load saat pertama kali dipakai"""
+        if self._db is None:
+            self._db = load_database()
+        return self._db
+    
+    def ensure_targets_table(self, cursor):
+        """Buat tabel program_targets dan program_scopes jika belum ada"""
+        # Scope hash per program, juga untuk program tanpa target sama sekali
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS program_scopes (
+                program_name VARCHAR(255) PRIMARY KEY,
+                scope_hash CHAR(32) NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS program_targets (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                program_name VARCHAR(255) NOT NULL,
+                domain VARCHAR(255) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE KEY uniq_program_domain (program_name, domain),
+                INDEX idx_domain (domain)
+            )
+        """)
+        # Tabel lama menyimpan scope hash per target; sekarang hanya di program_scopes
+        cursor.execute("SHOW COLUMNS FROM program_targets LIKE 'scope_hash'")
+        if cursor.fetchall():
+            cursor.execute("ALTER TABLE program_targets DROP COLUMN scope_hash")
+
     def get_programs_from_database(self):
-        """Ambil semua program dari tabel programs"""
+        """Ambil semua program beserta target scan-nya dalam satu query.
+
+        Target dihitung sekali dari kolom scope/program_url lalu disimpan ke
+        tabel program_targets, dengan scope hash per program di program_scopes;
+        hanya dihitung ulang jika scope program berubah (termasuk program yang
+        tidak punya target). Return dict {program_name: [domain, ...]}.
+        """
         try:
             # Connect to database first
             if not self.db.connect():
                 self.logger.error("Failed to connect to database")
-                return []
+                return {}
             
             cursor = self.db.connection.cursor()
-            cursor.execute("SELECT program_name, program_url FROM programs")
-            programs = cursor.fetchall()
+            self.ensure_targets_table(cursor)
+            cursor.execute("""
+                SELECT p.program_name, p.program_url, p.scope, s.scope_hash, t.domain
+                FROM programs p
+                LEFT JOIN program_scopes s ON s.program_name = p.program_name
+                LEFT JOIN program_targets t ON t.program_name = p.program_name
+            """)
+            rows = cursor.fetchall()
+            
+            programs = {}
+            for program_name, program_url, scope, scope_hash, domain in rows:
+                program = programs.setdefault(program_name, {
+                    'url': program_url,
+                    'scope': scope,
+                    'scope_hash': scope_hash,
+                    'targets': []
+                })
+                if domain:
+                    program['targets'].append(domain)
+            
+            # Hitung target hanya untuk program baru atau yang scope-nya berubah
+            computed = 0
+            for program_name, program in programs.items():
+                scope_hash = self.get_scope_hash(program['url'], program['scope'])
+                if program['scope_hash'] == scope_hash:
+                    continue
+                targets = self.compute_scan_targets(program['url'], program['scope'])
+                cursor.execute("DELETE FROM program_targets WHERE program_name = %s", (program_name,))
+                cursor.executemany(
+                    "INSERT IGNORE INTO program_targets (program_name, domain) VALUES (%s, %s)",
+                    [(program_name, target) for target in targets]
+                )
+                cursor.execute(
+                    "REPLACE INTO program_scopes (program_name, scope_hash) VALUES (%s, %s)",
+                    (program_name, scope_hash)
+                )
+                program['targets'] = targets
+                computed += 1
+            
+            if computed:
+                self.db.connection.commit()
             cursor.close()
             self.db.disconnect()
-            self.logger.info(f"Found {len(programs)} programs in database")
-            return programs
+            self.logger.info(f"Found {len(programs)} programs in database ({computed} target lists recomputed)")
+            return {name: program['targets'] for name, program in programs.items()}
         except Exception as e:
             self.logger.error(f"Error getting programs from database: {e}")
+            return {}
+    
+    def get_scope_hash(self, program_url: str, scope: str) -> str:
+        """Hash dari versi parser + program_url + scope untuk mendeteksi perubahan scope"""
+        content = f"{SCOPE_PARSER_VERSION}\n{program_url or ''}\n{scope or ''}"
+        return hashlib.md5(content.encode('utf-8')).hexdigest()
+    
+    def compute_scan_targets(self, program_url: str, scope: str) -> list:
+        """Tentukan domain yang di-scan untuk satu program.
+
+        Domain in-scope diambil dari kolom scope; jika kosong, fallback ke
+        domain program_url selama bukan domain platform (HackerOne, dll).
+        """
+        targets = self.parse_scope_domains(scope)
+        if not targets and program_url:
+            domain = self.extract_domain_from_url(program_url)
+            if domain and not self.is_platform_domain(domain):
+                targets = [domain.lower()]
+        return targets
+    
+    def parse_scope_domains(self, scope: str) -> list:
+        """Parse domain in-scope dari teks kolom scope.
+        
+        Scope dipecah per entry (baris, koma, titik koma). Token pertama entry
+        diambil jika berupa host, wildcard atau URL; sisa teks dianggap prosa
+        dan hanya URL dengan scheme atau wildcard di dalamnya yang diambil,
+        sehingga alamat email dan nama seperti asp.net tidak ikut jadi target.
+        """
+        if not scope:
             return []
+        
+        # Abaikan bagian out-of-scope jika ada
+        in_scope = OUT_OF_SCOPE_PATTERN.split(scope, maxsplit=1)[0]
+        
+        candidates = []
+        for entry in SCOPE_SEPARATOR_PATTERN.split(in_scope):
+            # Buang bullet list ("- ", "* ", "• ") di awal entry
+            entry = re.sub(r'^\s*(?:[-•]|\*(?=\s))\s*', '', entry)
+            tokens = entry.split(None, 1)
+            if not tokens:
+                continue
+            candidates.append(self.parse_scope_entry(tokens[0]))
+            if len(tokens) > 1:
+                candidates.extend(match.group(1) for match in EMBEDDED_TARGET_PATTERN.finditer(tokens[1]))
+        
+        domains = []
+        seen = set()
+        for domain in candidates:
+            if not domain:
+                continue
+            domain = domain.lower().rstrip('.')
+            if domain.startswith('www.'):
+                domain = domain[4:]
+            if domain.rsplit('.', 1)[-1] in NON_DOMAIN_SUFFIXES:
+                continue
+            if self.is_platform_domain(domain) or domain in seen:
+                continue
+            seen.add(domain)
+            domains.append(domain)
+        return domains
+    
+    def parse_scope_entry(self, token: str):
+        """Ambil host dari satu token scope (host, *.wildcard atau URL); None jika bukan target"""
+        token = token.strip('\'"`()[]<>.,:')
+        # Alamat email / mailto bukan target scan
+        if '@' in token:
+            return None
+        if '://' in token:
+            token = token.split('://', 1)[1]
+        host = re.split(r'[/?#:]', token, maxsplit=1)[0]
+        match = HOST_ENTRY_PATTERN.fullmatch(host)
+        return match.group(1) if match else None
+    
+    def is_platform_domain(self, domain: str) -> bool:
+        """Cek apakah domain milik platform bug bounty"""
+        domain = domain.lower()
+        return any(domain == platform or domain.endswith('.' + platform) for platform in PLATFORM_DOMAINS)
+    
+    def run_gau(self, domain: str, timeout: float = None, defer_slow: bool = False, use_cache: bool = True):
+        """Jalankan gau untuk satu domain, memakai cache jika tersedia.
+
+        Retry memanggil dengan use_cache=False karena cache domain tersebut sudah
+        dicek di percobaan pertama (supaya hit/miss dihitung sekali per domain);
+        hasil sukses tetap disimpan ke cache. Return None jika gagal, timeout,
+        atau ditunda karena domain dikenal lambat.
+        """
+        if self.cache and use_cache and not self.refresh:
+            cached_urls = self.cache.get(domain, self.gau_flags)
+            if cached_urls is not None:
+                return cached_urls
+        
+        if defer_slow and self.timeouts.is_slow(domain):
+            self.logger.info(f"Deferring known-slow domain to retry pass: {domain}")
+            self.last_failure[domain] = 'deferred'
+            return None
+        
+        urls = self.fetch_gau(domain, timeout)
+        if urls is None:
+            return None
+        
+        # Hanya hasil sukses yang di-cache, supaya kegagalan di-retry run berikutnya
+        if self.cache:
+            self.cache.set(domain, self.gau_flags, urls)
+        return urls
+    
+    def is_retryable(self, domain: str) -> bool:
+        """Retry hanya berguna untuk domain yang ditunda atau timeout"""
+        return self.last_failure.get(domain) in ('deferred', 'timeout')
     
-    def run_gau(self, domain: str):
-        """Jalankan gau untuk satu domain"""
+    def retry_domains(self, domains: list) -> dict:
+        """Pass prioritas rendah untuk domain yang ditunda atau timeout.
+        
+        Domain yang ditunda dijalankan sekali dulu dengan budget biasa; pass ini
+        bukan retry, sama seperti job yang ditunda di mode queue. Domain yang
+        timeout lalu di-retry maksimal max_retries ronde dengan backoff dan
+        budget yang makin besar. Backoff dijalankan sekali per ronde untuk semua
+        domain yang masih pending, bukan per domain. Domain yang gagal bukan
+        karena timeout tidak di-retry lagi. Return dict {domain: urls}.
+        """
+        results = {}
+        deferred = [domain for domain in domains if self.last_failure.get(domain) == 'deferred']
+        pending = [domain for domain in domains if self.last_failure.get(domain) != 'deferred']
+        
+        for domain in deferred:
+            urls = self.run_gau(domain, use_cache=False)
+            if urls is not None:
+                results[domain] = urls
+            elif self.is_retryable(domain):
+                pending.append(domain)
+            else:
+                results[domain] = self.give_up(domain)
+        
+        for attempt in range(1, self.max_retries + 1):
+            if not pending:
+                break
+            
+            delay = self.timeouts.get_retry_delay(attempt)
+            if delay:
+                self.logger.info(f"Retry round {attempt} for {len(pending)} domains in {delay:.0f}s")
+                time.sleep(delay)
+            
+            still_pending = []
+            for domain in pending:
+                urls = self.run_gau(domain, timeout=self.timeouts.get_retry_timeout(domain, attempt), use_cache=False)
+                if urls is not None:
+                    results[domain] = urls
+                elif self.is_retryable(domain):
+                    still_pending.append(domain)
+                else:
+                    results[domain] = self.give_up(domain)
+            pending = still_pending
+        
+        for domain in pending:
+            results[domain] = self.give_up(domain)
+        return results
+    
+    def give_up(self, domain: str) -> list:
+        """Berhenti mencoba domain: pakai hasil parsial terbaik daripada membuangnya"""
+        partial_urls = self.partial_results.pop(domain, [])
+        self.logger.warning(f"GAU gave up on {domain}, keeping {len(partial_urls)} partial URLs")
+        return partial_urls
+    
+    def fetch_gau(self, domain: str, timeout: float = None):
+        """Eksekusi gau untuk satu domain; return None jika gagal"""
+        if timeout is None:
+            timeout = self.timeouts.get_timeout(domain)
+        
+        started = time.monotonic()
         try:
-            cmd = ['gau', domain]
-            self.logger.info(f"Running gau for: {domain}")
+            cmd = ['gau', *self.gau_flags, domain]
+            self.logger.info(f"Running gau for: {domain} (timeout {timeout:.0f}s)")
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
             
             if result.returncode == 0:
+                self.timeouts.record(domain, time.monotonic() - started)
+                self.partial_results.pop(domain, None)
+                self.last_failure.pop(domain, None)
                 urls = [line.strip() for line in result.stdout.split('\n') if line.strip()]
                 self.logger.info(f"Found {len(urls)} URLs for {domain}")
                 return urls
             else:
                 self.logger.warning(f"GAU failed for {domain}: {result.stderr}")
-                return []
+                self.last_failure[domain] = 'failed'
+                return None
                 
-        except subprocess.TimeoutExpired:
-            self.logger.error(f"GAU timeout for {domain}")
-            return []
+        except subprocess.TimeoutExpired as e:
+            self.timeouts.record(domain, timeout, timed_out=True)
+            self.last_failure[domain] = 'timeout'
+            output = decode_partial_output(e.stdout)
+            partial_urls = [line.strip() for line in output.split('\n') if line.strip()]
+            if len(partial_urls) > len(self.partial_results.get(domain, [])):
+                self.partial_results[domain] = partial_urls
+            self.logger.error(f"GAU timeout for {domain} after {timeout:.0f}s ({len(partial_urls)} partial URLs kept)")
+            return None
         except FileNotFoundError:
+            # Tanpa gau tidak ada domain yang bisa diproses, hentikan seluruh run
             self.logger.error("GAU tool not found. Install dengan: go install github.com/lc/gau/v2/cmd/gau@latest")
-            return []
+            sys.exit(1)
         except Exception as e:
             self.logger.error(f"Error running GAU for {domain}: {e}")
-            return []
+            self.last_failure[domain] = 'failed'
+            return None
     
     def save_results(self, urls: list, program_name: str):
         """Simpan hasil ke file dengan pola penamaan yang konsisten"""
@@ -95,6 +503,7 @@ class GAURunner:
         filepath = os.path.join(self.output_dir, filename)
         
         try:
+            os.makedirs(self.output_dir, exist_ok=True)
             with open(filepath, 'w', encoding='utf-8') as f:
                 for url in urls:
                     f.write(url + '\n')
@@ -105,25 +514,168 @@ class GAURunner:
             self.logger.error(f"Error saving results for {program_name}: {e}")
     
     def run_all_programs(self):
-        """Jalankan gau untuk semua program dari database"""
+        """Jalankan gau untuk semua program dari database.
+
+        Pass utama melewati domain yang dikenal lambat dan domain yang timeout;
+        keduanya dijalankan belakangan di pass retry prioritas rendah. Domain
+        yang gagal karena sebab lain tidak di-retry.
+        """
         programs = self.get_programs_from_database()
         
         if not programs:
             self.logger.error("No programs found in database")
             return
         
+        # Hitung berapa program yang memakai setiap domain, supaya domain
+        # yang sama hanya di-fetch gau sekali per run
+        domain_refs = {}
+        for targets in programs.values():
+            for domain in targets:
+                domain_refs[domain] = domain_refs.get(domain, 0) + 1
+        self.logger.info(f"{len(domain_refs)} unique domains across {len(programs)} programs")
+        
+        domain_results = {}
+        retry_domains = {}
+        pending_programs = []
         total_urls = 0
-        for program_name, program_url in programs:
-            # Extract domain dari program_url
-            domain = self.extract_domain_from_url(program_url)
-            if domain:
-                raw_urls = self.run_gau(domain)
-                # Parse dan filter URLs
-                filtered_urls = self.parse_and_filter_urls(raw_urls)
-                self.save_results(filtered_urls, program_name)
-                total_urls += len(filtered_urls)
+        for program_name, targets in programs.items():
+            if not targets:
+                self.logger.warning(f"No scan targets for {program_name}, skipping")
+                continue
+            
+            for domain in targets:
+                if domain in domain_results or domain in retry_domains:
+                    continue
+                urls = self.run_gau(domain, defer_slow=True)
+                if urls is not None:
+                    domain_results[domain] = urls
+                elif self.is_retryable(domain):
+                    retry_domains[domain] = True
+                else:
+                    domain_results[domain] = self.give_up(domain)
+            
+            if any(domain in retry_domains for domain in targets):
+                pending_programs.append(program_name)
+            else:
+                total_urls += self.process_program(program_name, targets, domain_results, domain_refs)
         
+        # Pass retry prioritas rendah untuk domain lambat/timeout
+        if retry_domains:
+            self.logger.info(f"Retry pass for {len(retry_domains)} slow or timed out domains")
+            domain_results.update(self.retry_domains(list(retry_domains)))
+        
+        for program_name in pending_programs:
+            total_urls += self.process_program(program_name, programs[program_name], domain_results, domain_refs)
+        
+        self.timeouts.save()
         self.logger.info(f"GAU scanning completed. Total URLs found: {total_urls}")
+        if self.cache:
+            self.logger.info(self.cache.summary())
+    
+    def process_program(self, program_name: str, targets: list, domain_results: dict, domain_refs: dict) -> int:
+        """Gabungkan hasil domain milik satu program, filter, lalu simpan"""
+        domain_urls = [domain_results.get(domain, []) for domain in targets]
+        for domain in targets:
+            # Lepas hasil domain setelah program terakhir yang memakainya
+            domain_refs[domain] -= 1
+            if domain_refs[domain] == 0:
+                domain_results.pop(domain, None)
+        
+        # Parse dan filter URLs tanpa menggabungkan semua hasil domain ke satu list
+        filtered_urls = self.parse_and_filter_urls(url for urls in domain_urls for url in urls)
+        self.save_results(filtered_urls, program_name)
+        return len(filtered_urls)
+    
+    def enqueue_programs(self, queue):
+        """Mode coordinator: masukkan setiap domain unik sebagai job ke queue"""
+        programs = self.get_programs_from_database()
+        if not programs:
+            self.logger.error("No programs found in database")
+            return None
+        
+        domains = []
+        seen = set()
+        for targets in programs.values():
+            for domain in targets:
+                if domain not in seen:
+                    seen.add(domain)
+                    domains.append(domain)
+        
+        # Output parsial ditulis di samping queue supaya terbaca dari semua node
+        run_id = queue.new_run_id('gau')
+        parts_dir = queue.get_parts_dir(run_id)
+        jobs = [(domain, {'domain': domain, 'output': os.path.join(parts_dir, f"{domain}.txt")}) for domain in domains]
+        return queue.create_run('gau', {'programs': programs}, jobs, run_id=run_id)
+    
+    def process_queue_job(self, job: dict, queue) -> dict:
+        """Mode worker: jalankan gau untuk satu domain dan tulis hasil parsial"""
+        domain = job['payload']['domain']
+        
+        if job['attempts'] == 1:
+            # Domain yang dikenal lambat (dan tidak ada di cache) dikembalikan ke antrian
+            # sekali, dikerjakan setelah job lain; cache sudah dicek sebelum ditunda
+            urls = self.run_gau(domain, defer_slow=not job['deferred'], use_cache=not job['deferred'])
+        else:
+            urls = self.run_gau(domain, timeout=self.timeouts.get_retry_timeout(domain, job['attempts'] - 1),
+                                use_cache=False)
+        
+        if urls is None:
+            if self.last_failure[domain] == 'deferred':
+                from work_queue import DeferredJob
+                raise DeferredJob(f"known-slow domain {domain}")
+            # Gagal bukan karena timeout: retry tidak akan membantu
+            if self.is_retryable(domain) and not queue.is_last_attempt(job):
+                raise RuntimeError(f"gau {self.last_failure[domain]} for {domain}")
+            urls = self.give_up(domain)
+        
+        part_path = job['payload']['output']
+        os.makedirs(os.path.dirname(part_path), exist_ok=True)
+        tmp_path = f"{part_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for url in urls:
+                f.write(url + '\n')
+        os.replace(tmp_path, part_path)
+        
+        return {'urls': len(urls)}
+    
+    def run_worker(self, queue) -> int:
+        """Mode worker: proses job gau dari queue sampai habis"""
+        processed = queue.work('gau', lambda job: self.process_queue_job(job, queue),
+                               retry_delay=self.timeouts.get_retry_delay)
+        self.timeouts.save()
+        if self.cache:
+            self.logger.info(self.cache.summary())
+        return processed
+    
+    def merge_queue_results(self, queue) -> bool:
+        """Gabungkan output parsial worker ke scans/gau/{program}-gau.txt"""
+        run_id, meta = queue.get_latest_run('gau')
+        if not run_id:
+            self.logger.error("No unmerged gau run found in queue")
+            return False
+        
+        counts = queue.get_counts('gau', run_id)
+        if counts.get('pending') or counts.get('running'):
+            self.logger.error(f"Run {run_id} is not finished yet: {counts}")
+            return False
+        if counts.get('failed'):
+            self.logger.warning(f"Run {run_id} has {counts['failed']} failed domains, merging the rest")
+        
+        part_paths = {job['key']: job['payload']['output'] for job in queue.get_jobs(run_id)}
+        total_urls = 0
+        for program_name, targets in meta['programs'].items():
+            if not targets:
+                continue
+            
+            paths = [part_paths[domain] for domain in targets if domain in part_paths]
+            filtered_urls = self.parse_and_filter_urls(read_input_lines([path for path in paths if os.path.exists(path)]))
+            self.save_results(filtered_urls, program_name)
+            total_urls += len(filtered_urls)
+        
+        queue.mark_merged(run_id)
+        shutil.rmtree(queue.get_parts_dir(run_id), ignore_errors=True)
+        self.logger.info(f"Merged run {run_id}. Total URLs found: {total_urls}")
+        return True
     
     def extract_domain_from_url(self, url: str) -> str:
         """Extract domain dari URL program"""
@@ -144,45 +696,42 @@ class GAURunner:
             self.logger.error(f"Error extracting domain from {url}: {e}")
             return None
     
-    def parse_and_filter_urls(self, urls: list) -> list:
-        """Parse dan filter URLs: remove duplicates dan similar URLs"""
+    def parse_and_filter_urls(self, urls) -> list:
+        """Parse dan filter URLs: remove duplicates dan similar URLs.
+
+        URLs diproses secara streaming (boleh berupa generator): URL tanpa
+        ID/UUID langsung diagregasi per group, sehingga memory sebanding
+        dengan jumlah group, bukan jumlah URL.
+        """
         if not urls:
             return []
         
-        # Step 1: Remove exact duplicates
-        unique_urls = list(set(urls))
-        self.logger.info(f"After removing duplicates: {len(unique_urls)} URLs")
-        
-        # Step 2: Pisahkan URL yang mengandung ID/UUID (jangan difilter)
-        urls_with_ids, urls_without_ids = self.separate_urls_with_ids(unique_urls)
-        self.logger.info(f"URLs with IDs/UUIDs: {len(urls_with_ids)}, URLs without IDs: {len(urls_without_ids)}")
+        # Step 1: Pisahkan URL yang mengandung ID/UUID (jangan difilter, hanya dedup)
+        # Step 2: Group similar URLs untuk yang tanpa ID/UUID, simpan representatif terbaik saja
+        urls_with_ids = set()
+        grouped_urls = {}
+        total_urls = 0
+        for url in urls:
+            total_urls += 1
+            if self.contains_id_or_uuid(url):
+                urls_with_ids.add(url)
+            else:
+                self.add_to_group(grouped_urls, url)
         
-        # Step 3: Group similar URLs hanya untuk yang tanpa ID/UUID
-        grouped_urls = self.group_similar_urls(urls_without_ids)
+        self.logger.info(f"Processed {total_urls} URLs. URLs with IDs/UUIDs: {len(urls_with_ids)}, "
+                         f"groups without IDs: {len(grouped_urls)}")
+        self.log_largest_groups(grouped_urls)
         
-        # Step 4: Select one representative dari setiap group
+        # Step 3: Ambil representatif dari setiap group
         filtered_urls_without_ids = self.select_representative_urls(grouped_urls)
         
-        # Step 5: Gabungkan kembali dengan URLs yang mengandung ID/UUID
-        final_urls = urls_with_ids + filtered_urls_without_ids
+        # Step 4: Gabungkan kembali dengan URLs yang mengandung ID/UUID
+        final_urls = list(urls_with_ids) + filtered_urls_without_ids
         final_urls.sort()  # Urutkan untuk konsistensi
         
         self.logger.info(f"Final URLs after filtering: {len(final_urls)} URLs")
         return final_urls
     
-    def separate_urls_with_ids(self, urls: list) -> tuple:
-        """Pisahkan URL yang mengandung ID numeric atau UUID"""
-        urls_with_ids = []
-        urls_without_ids = []
-        
-        for url in urls:
-            if self.contains_id_or_uuid(url):
-                urls_with_ids.append(url)
-            else:
-                urls_without_ids.append(url)
-        
-        return urls_with_ids, urls_without_ids
-    
     def contains_id_or_uuid(self, url: str) -> bool:
         """Cek apakah URL mengandung ID numeric atau UUID pattern"""
         try:
@@ -227,33 +776,58 @@ class GAURunner:
             # Jika parsing gagal, assume tidak mengandung ID/UUID
             return False
     
-    def group_similar_urls(self, urls: list) -> dict:
-        """Group URLs berdasarkan similarity pattern"""
-        groups = {}
+    def get_group_key(self, url: str) -> str:
+        """Key group untuk satu URL"""
+        try:
+            parsed = urlparse(url)
+            base_path = self.get_base_path(parsed.path)
+            
+            # Untuk URL dengan query parameters, group berdasarkan base pattern
+            if parsed.query:
+                # Decode URL-encoded parameters
+                decoded_query = unquote(parsed.query)
+                return f"{parsed.netloc}{base_path}?{self.get_query_pattern(decoded_query)}"
+            return f"{parsed.netloc}{base_path}"
+            
+        except Exception as e:
+            self.logger.warning(f"Error parsing URL {url}: {e}")
+            # Jika parsing gagal, treat sebagai unique URL
+            return url
+    
+    def add_to_group(self, groups: dict, url: str):
+        """Tambahkan URL ke group-nya, hanya menyimpan top-K URL paling pendek.
         
-        for url in urls:
-            try:
-                parsed = urlparse(url)
-                base_path = self.get_base_path(parsed.path)
-                
-                # Untuk URL dengan query parameters, group berdasarkan base pattern
-                if parsed.query:
-                    # Decode URL-encoded parameters
-                    decoded_query = unquote(parsed.query)
-                    group_key = f"{parsed.netloc}{base_path}?{self.get_query_pattern(decoded_query)}"
-                else:
-                    group_key = f"{parsed.netloc}{base_path}"
-                
-                if group_key not in groups:
-                    groups[group_key] = []
-                groups[group_key].append(url)
-                
-            except Exception as e:
-                self.logger.warning(f"Error parsing URL {url}: {e}")
-                # Jika parsing gagal, treat sebagai unique URL
-                groups[url] = [url]
+        Group berbentuk {'occurrences': n, 'urls': [representatif]}. occurrences
+        menghitung setiap kemunculan URL, termasuk duplikat persis, karena URL
+        unik tidak disimpan supaya memory tetap sebanding dengan jumlah group.
+        """
+        group_key = self.get_group_key(url)
+        group = groups.get(group_key)
+        if group is None:
+            groups[group_key] = {'occurrences': 1, 'urls': [url]}
+            return
         
-        return groups
+        group['occurrences'] += 1
+        best_urls = group['urls']
+        if url in best_urls:
+            return
+        
+        # Pilih URL yang paling "clean" atau pendek; seri diputus secara alfabetis
+        rank = (len(url), url)
+        if len(best_urls) < self.top_k:
+            best_urls.append(url)
+        elif rank < (len(best_urls[-1]), best_urls[-1]):
+            best_urls[-1] = url
+        else:
+            return
+        best_urls.sort(key=lambda candidate: (len(candidate), candidate))
+    
+    def log_largest_groups(self, grouped_urls: dict, limit: int = 5):
+        """Log group dengan URL terbanyak untuk reporting"""
+        largest = sorted(grouped_urls.items(), key=lambda item: item[1]['occurrences'], reverse=True)[:limit]
+        for group_key, group in largest:
+            if group['occurrences'] > 1:
+                self.logger.info(f"Group {group_key}: {group['occurrences']} URL occurrences (duplicates included)")
     
     def get_base_path(self, path: str) -> str:
         """Extract base path pattern"""
@@ -285,32 +859,125 @@ class GAURunner:
             return query  # Fallback ke query asli jika parsing gagal
     
     def select_representative_urls(self, grouped_urls: dict) -> list:
-        """Pilih satu URL representatif dari setiap group"""
+        """Ambil URL representatif dari setiap group"""
         representative_urls = []
         
-        for group_key, urls_in_group in grouped_urls.items():
-            if len(urls_in_group) == 1:
-                # Hanya satu URL di group, langsung ambil
-                representative_urls.append(urls_in_group[0])
-            else:
-                # Pilih URL yang paling "clean" atau pendek
-                urls_in_group.sort(key=len)  # Urutkan berdasarkan panjang
-                representative_url = urls_in_group[0]
-                
+        for group_key, group in grouped_urls.items():
+            if group['occurrences'] > 1:
                 # Log grouping information untuk debugging
-                self.logger.debug(f"Group {group_key}: selected {representative_url} from {len(urls_in_group)} similar URLs")
-                representative_urls.append(representative_url)
+                self.logger.debug(f"Group {group_key}: selected {', '.join(group['urls'])} from {group['occurrences']} URL occurrences")
+            representative_urls.extend(group['urls'])
         
         return representative_urls
 
+def parse_args():
+    """Parse argument command line"""
+    parser = argparse.ArgumentParser(description="GAU runner untuk semua program di database scout")
+    parser.add_argument('--refresh', action='store_true',
+                        help='Abaikan cache dan fetch ulang semua domain (hasil baru tetap disimpan ke cache)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Nonaktifkan cache hasil gau sepenuhnya')
+    parser.add_argument('--cache-dir', default='scans/.cache/gau',
+                        help='Direktori cache hasil gau (default: scans/.cache/gau)')
+    parser.add_argument('--cache-ttl', type=float, default=24,
+                        help='Umur maksimum entry cache dalam jam (default: 24)')
+    parser.add_argument('--cache-max-mb', type=float, default=1024,
+                        help='Ukuran maksimum cache dalam MB sebelum LRU eviction (default: 1024)')
+    parser.add_argument('--max-retries', type=int, default=2,
+                        help='Jumlah retry untuk domain yang lambat/gagal di pass retry (default: 2)')
+    parser.add_argument('--retry-backoff', type=float, default=30,
+                        help='Delay awal exponential backoff antar retry dalam detik (default: 30)')
+    parser.add_argument('--top-k', type=int, default=1,
+                        help='Jumlah URL representatif (terpendek) yang disimpan per group similar URLs (default: 1)')
+    parser.add_argument('--filter', nargs='*', metavar='FILE',
+                        help='Mode offline: filter URL dari FILE (atau stdin) ke stdout tanpa database/gau')
+    
+    distributed = parser.add_argument_group('distributed mode')
+    mode = distributed.add_mutually_exclusive_group()
+    mode.add_argument('--coordinator', action='store_true',
+                      help='Masukkan semua domain ke queue (lalu jalankan --local-workers jika diisi)')
+    mode.add_argument('--worker', action='store_true',
+                      help='Ambil dan proses job gau dari queue sampai habis')
+    mode.add_argument('--merge', action='store_true',
+                      help='Gabungkan hasil worker ke scans/gau')
+    distributed.add_argument('--queue', default='scans/queue.db',
+                             help='Path file queue SQLite di shared volume (default: scans/queue.db)')
+    distributed.add_argument('--local-workers', type=int, default=0,
+                             help='Dengan --coordinator: jalankan N worker lokal lalu merge hasilnya')
+    return parser.parse_args()
+
+def get_worker_args(args) -> list:
+    """Argumen yang diteruskan coordinator ke worker lokal"""
+    worker_args = ['--worker', '--queue', args.queue,
+                   '--cache-dir', args.cache_dir,
+                   '--cache-ttl', str(args.cache_ttl),
+                   '--cache-max-mb', str(args.cache_max_mb),
+                   '--max-retries', str(args.max_retries),
+                   '--retry-backoff', str(args.retry_backoff)]
+    if args.refresh:
+        worker_args.append('--refresh')
+    if args.no_cache:
+        worker_args.append('--no-cache')
+    return worker_args
+
+def run_local_workers(args, count: int) -> bool:
+    """Jalankan N proses worker lokal dan tunggu semuanya selesai"""
+    logger = logging.getLogger(__name__)
+    cmd = [sys.executable, os.path.abspath(__file__), *get_worker_args(args)]
+    workers = [subprocess.Popen(cmd) for _ in range(count)]
+    logger.info(f"Started {count} local gau workers")
+    return all(worker.wait() == 0 for worker in workers)
+
 def main():
     """Main entry point"""
+    args = parse_args()
+    
+    if args.filter is not None:
+        setup_logging(offline=True)
+        runner = GAURunner(top_k=args.top_k)
+        try:
+            for url in runner.parse_and_filter_urls(read_input_lines(args.filter)):
+                print(url)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # Pembaca output berhenti lebih dulu (mis. | head): buang sisa output tanpa traceback
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
+        except OSError as e:
+            logging.getLogger(__name__).error(f"Cannot read input: {e}")
+            sys.exit(1)
+        return
+    
     setup_logging()
     logger = logging.getLogger(__name__)
     
     try:
-        runner = GAURunner()
-        runner.run_all_programs()
+        cache = None
+        if not args.no_cache:
+            cache = GAUCache(cache_dir=args.cache_dir, ttl_hours=args.cache_ttl, max_size_mb=args.cache_max_mb)
+        runner = GAURunner(cache=cache, refresh=args.refresh,
+                           max_retries=args.max_retries, retry_backoff=args.retry_backoff,
+                           top_k=args.top_k)
+        
+        if args.coordinator or args.worker or args.merge:
+            from work_queue import WorkQueue
+            
+            # Satu attempt untuk pass utama, sisanya untuk retry
+            queue = WorkQueue(args.queue, max_attempts=args.max_retries + 1)
+            
+            if args.coordinator:
+                run_id = runner.enqueue_programs(queue)
+                if run_id and args.local_workers > 0:
+                    if not run_local_workers(args, args.local_workers):
+                        logger.warning("Some local workers exited with an error")
+                    runner.merge_queue_results(queue)
+            elif args.worker:
+                runner.run_worker(queue)
+            else:
+                if not runner.merge_queue_results(queue):
+                    sys.exit(1)
+        else:
+            runner.run_all_programs()
         logger.info("GAU runner completed successfully")
         
     except KeyboardInterrupt:
@@ -9,33 +9,57 @@ import os
 import sys
 import logging
 import re
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import itertools
 from datetime import datetime
 
-# Add scout project directory to path for imports
-scout_project_path = os.path.join(os.path.dirname(__file__), '..', 'scout')
-sys.path.append(scout_project_path)
+from adaptive_timeout import AdaptiveTimeout, decode_partial_output
+from scan_generations import ensure_generation_tables, acquire_generation_lock, release_generation_lock
+from runner_common import load_database, setup_logging, read_input_lines
 
-from src.db import Database
+# Selisih relatif content length yang masih dianggap halaman yang sama (token, timestamp, dll)
+CONTENT_LENGTH_TOLERANCE = 0.1
 
-def setup_logging():
-    """Setup basic logging configuration"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('scout.log'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+# Jumlah baris awal input --parse yang dipakai untuk menebak format -cl
+PARSE_SNIFF_LINES = 1000
 
 class HTTPXRunner:
     """HTTPX tool runner untuk scan semua subdomain dari database"""
     
-    def __init__(self, output_dir: str = "scans/httpx"):
+    def __init__(self, output_dir: str = "scans/httpx", max_retries: int = 2, retry_backoff: float = 30):
         self.logger = logging.getLogger(__name__)
         self.output_dir = output_dir
-        os.makedirs(self.output_dir, exist_ok=True)
-        self.db = Database(config_path=os.path.join(os.path.dirname(__file__), '..', 'scout', 'config.json'))
+        self.max_retries = max_retries
+        # Budget bulk httpx dihitung dari jumlah baris input dan latency per baris run sebelumnya
+        self.timeouts = AdaptiveTimeout(
+            state_file=os.path.join('scans', '.state', 'httpx-latency.json'),
+            default_timeout=300,
+            min_timeout=120,
+            max_timeout=7200,
+            default_per_line=0.5,
+            retry_backoff=retry_backoff
+        )
+        self.subdomain_timeouts = AdaptiveTimeout(
+            state_file=os.path.join('scans', '.state', 'httpx-subdomain-latency.json'),
+            default_timeout=60,
+            min_timeout=15,
+            max_timeout=300,
+            retry_backoff=retry_backoff
+        )
+        # Alasan bulk run terakhir gagal per file: 'timeout' atau 'failed'
+        self.last_failure = {}
+        self._db = None
+    
+    @property
+    def db(self):
+        """Database scout, baru di-load saat pertama kali dipakai"""
+        if self._db is None:
+            self._db = load_database()
+        return self._db
     
     def get_subdomains_from_database(self):
         """Ambil semua subdomain dari tabel subdomains"""
@@ -56,16 +80,21 @@ class HTTPXRunner:
             self.logger.error(f"Error getting subdomains from database: {e}")
             return []
     
-    def run_httpx(self, subdomain: str):
+    def run_httpx(self, subdomain: str, timeout: float = None):
         """Jalankan httpx untuk satu subdomain"""
+        if timeout is None:
+            timeout = self.subdomain_timeouts.get_timeout(subdomain)
+        
+        started = time.monotonic()
         try:
-            # Gunakan echo untuk pipe subdomain ke httpx
-            cmd = f'echo "{subdomain}" | httpx -sc -td -title -silent'
+            # Subdomain dikirim lewat stdin ke httpx
+            cmd = ['httpx', '-sc', '-td', '-title', '-silent']
             self.logger.info(f"Running httpx for: {subdomain}")
             
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=60)
+            result = subprocess.run(cmd, input=subdomain + '\n', capture_output=True, text=True, timeout=timeout)
             
             if result.returncode == 0:
+                self.subdomain_timeouts.record(subdomain, time.monotonic() - started)
                 output = result.stdout.strip()
                 if output:
                     # Parse output httpx
@@ -96,59 +125,607 @@ class HTTPXRunner:
                 return None
                 
         except subprocess.TimeoutExpired:
-            self.logger.error(f"HTTPX timeout for {subdomain}")
+            self.subdomain_timeouts.record(subdomain, timeout, timed_out=True)
+            self.logger.error(f"HTTPX timeout for {subdomain} after {timeout:.0f}s")
             return None
         except FileNotFoundError:
             self.logger.error("HTTPX tool not found. Install dengan: go install -v github.com/projectdiscovery/httpx/cmd/httpx@latest")
-            return None
+            sys.exit(1)
         except Exception as e:
             self.logger.error(f"Error running HTTPX for {subdomain}: {e}")
             return None
 
-    def run_httpx_bulk_file(self, input_file: str, output_file: str = None):
-        """Jalankan httpx untuk file input secara bulk"""
+    def run_httpx_bulk_file(self, input_file: str, output_file: str = None, timeout: float = None,
+                            keep_partial: bool = False):
+        """Jalankan httpx untuk file input secara bulk.
+
+        Budget timeout disesuaikan dengan jumlah baris input. Jika keep_partial
+        aktif, hasil parsial dari run yang timeout tetap disimpan.
+        """
         try:
             if not os.path.exists(input_file):
                 self.logger.error(f"Input file not found: {input_file}")
                 return False
             
             # Jika output_file tidak ditentukan, buat nama file otomatis
+            base_name = self.get_file_key(input_file)
             if not output_file:
-                base_name = os.path.splitext(os.path.basename(input_file))[0]
                 output_file = os.path.join(self.output_dir, f"{base_name}-httpx.txt")
             
-            # Jalankan command: cat file.txt | httpx -sc -td -title -timeout 30 -silent -no-color
-            cmd = f'cat "{input_file}" | httpx -sc -td -title -timeout 30 -silent -no-color'
-            self.logger.info(f"Running bulk httpx for file: {input_file}")
+            line_count = self.count_lines(input_file)
+            if timeout is None:
+                timeout = self.timeouts.get_timeout(base_name, line_count)
             
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=300)
+            status, output = self.execute_httpx(input_file, base_name, line_count, timeout)
             
-            if result.returncode == 0:
-                output = result.stdout.strip()
+            if status == 'timeout':
+                if keep_partial and output:
+                    self.logger.warning(f"Keeping {len(output.splitlines())} partial httpx results for {input_file}")
+                    self.process_bulk_output(input_file, output_file, output, partial=True)
+                return False
+            
+            if status == 'ok':
                 if output:
-                    # Simpan hasil langsung ke file output
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        f.write(output + '\n')
-                    
-                    self.logger.info(f"Bulk httpx completed. Results saved to: {output_file}")
+                    self.process_bulk_output(input_file, output_file, output)
                     self.logger.info(f"Output preview:\n{output}")
                     return True
                 else:
                     self.logger.warning(f"No results from bulk httpx for file: {input_file}")
                     return False
             else:
-                self.logger.error(f"Bulk httpx failed for file {input_file}: {result.stderr}")
                 return False
                 
-        except subprocess.TimeoutExpired:
-            self.logger.error(f"Bulk httpx timeout for file: {input_file}")
+        except Exception as e:
+            self.logger.error(f"Error running bulk httpx for file {input_file}: {e}")
+            self.last_failure[self.get_file_key(input_file)] = 'failed'
             return False
-        except FileNotFoundError:
-            self.logger.error("HTTPX tool not found. Install dengan: go install -v github.com/projectdiscovery/httpx/cmd/httpx@latest")
+    
+    def execute_httpx(self, input_file: str, key: str, line_count: int, timeout: float) -> tuple:
+        """Eksekusi httpx untuk satu file input dan catat latency-nya.
+
+        Return (status, output) dengan status 'ok', 'timeout' atau 'failed';
+        untuk 'timeout' output berisi hasil parsial.
+        """
+        # Jalankan command: httpx -sc -cl -td -title -timeout 30 -silent -no-color < file.txt
+        cmd = ['httpx', '-sc', '-cl', '-td', '-title', '-timeout', '30', '-silent', '-no-color']
+        self.logger.info(f"Running bulk httpx for file: {input_file} ({line_count} lines, timeout {timeout:.0f}s)")
+        
+        started = time.monotonic()
+        with open(input_file, 'r', encoding='utf-8') as input_handle:
+            try:
+                result = subprocess.run(cmd, stdin=input_handle, capture_output=True, text=True, timeout=timeout)
+            except subprocess.TimeoutExpired as e:
+                self.timeouts.record(key, timeout, line_count, timed_out=True)
+                self.last_failure[key] = 'timeout'
+                self.logger.error(f"Bulk httpx timeout for file: {input_file} after {timeout:.0f}s")
+                return 'timeout', decode_partial_output(e.stdout).strip()
+            except FileNotFoundError:
+                # Tanpa httpx tidak ada file yang bisa diproses, hentikan seluruh run
+                self.logger.error("HTTPX tool not found. Install dengan: go install -v github.com/projectdiscovery/httpx/cmd/httpx@latest")
+                sys.exit(1)
+        
+        if result.returncode != 0:
+            self.logger.error(f"Bulk httpx failed for file {input_file}: {result.stderr}")
+            self.last_failure[key] = 'failed'
+            return 'failed', ""
+        
+        self.timeouts.record(key, time.monotonic() - started, line_count)
+        self.last_failure.pop(key, None)
+        return 'ok', result.stdout.strip()
+    
+    def enqueue_files(self, queue, input_files: list, shard_size: int = 5000):
+        """Mode coordinator: pecah file input jadi shard dan masukkan ke queue"""
+        # Shard ditulis di samping queue supaya terbaca dari semua node
+        run_id = queue.new_run_id('httpx')
+        parts_dir = queue.get_parts_dir(run_id)
+        files_meta = {}
+        jobs = []
+        
+        for file_index, input_file in enumerate(input_files):
+            # Nama file bisa sama di subdirektori berbeda; shard dan job memakai id
+            # unik per file, base name hanya untuk file output
+            base_name = self.get_file_key(input_file)
+            file_id = f"{file_index:05d}-{base_name}"
+            shard_dir = os.path.join(parts_dir, file_id)
+            os.makedirs(shard_dir, exist_ok=True)
+            
+            shard_count = 0
+            shard_lines = []
+            with open(input_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        shard_lines.append(line.strip())
+                    if len(shard_lines) >= shard_size:
+                        jobs.append(self.write_shard(file_id, base_name, shard_dir, shard_count, shard_lines))
+                        shard_count += 1
+                        shard_lines = []
+            if shard_lines:
+                jobs.append(self.write_shard(file_id, base_name, shard_dir, shard_count, shard_lines))
+                shard_count += 1
+            
+            if shard_count:
+                files_meta[file_id] = {'base': base_name, 'source_file': input_file, 'shards': shard_count}
+        
+        return queue.create_run('httpx', {'files': files_meta}, jobs, run_id=run_id)
+    
+    def write_shard(self, file_id: str, base_name: str, shard_dir: str, index: int, lines: list) -> tuple:
+        """Tulis satu shard input dan kembalikan job (key, payload)"""
+        shard_input = os.path.join(shard_dir, f"input-{index:05d}.txt")
+        with open(shard_input, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        
+        return f"{file_id}/{index:05d}", {
+            'file': file_id,
+            'base': base_name,
+            'input': shard_input,
+            'output': os.path.join(shard_dir, f"output-{index:05d}.txt")
+        }
+    
+    def process_queue_job(self, job: dict, queue) -> dict:
+        """Mode worker: jalankan httpx untuk satu shard dan tulis output parsial"""
+        payload = job['payload']
+        base_name = payload['base']
+        line_count = self.count_lines(payload['input'])
+        
+        if job['attempts'] == 1:
+            # File yang lambat pada run sebelumnya dikembalikan ke antrian sekali,
+            # dikerjakan setelah shard lain. Timeout shard lain dari file yang sama
+            # di run ini tidak ikut menunda shard ini.
+            if self.timeouts.was_slow(base_name) and not job['deferred']:
+                from work_queue import DeferredJob
+                raise DeferredJob(f"known-slow file {base_name}")
+            timeout = self.timeouts.get_timeout(base_name, line_count)
+        else:
+            timeout = self.timeouts.get_retry_timeout(base_name, job['attempts'] - 1, line_count)
+        
+        status, output = self.execute_httpx(payload['input'], base_name, line_count, timeout)
+        # Hanya timeout yang di-retry; shard yang gagal karena sebab lain langsung
+        # diselesaikan tanpa hasil dan ditandai parsial saat merge
+        if status == 'timeout' and not queue.is_last_attempt(job):
+            raise RuntimeError(f"httpx timeout for shard {job['key']}")
+        
+        tmp_path = f"{payload['output']}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if output:
+                f.write(output + '\n')
+        os.replace(tmp_path, payload['output'])
+        
+        return {'results': len(output.splitlines()) if output else 0, 'partial': status != 'ok'}
+    
+    def run_worker(self, queue) -> int:
+        """Mode worker: proses shard httpx dari queue sampai habis"""
+        processed = queue.work('httpx', lambda job: self.process_queue_job(job, queue),
+                               retry_delay=self.timeouts.get_retry_delay)
+        self.timeouts.save()
+        return processed
+    
+    def merge_queue_results(self, queue) -> bool:
+        """Gabungkan output shard ke scans/httpx/{base}-httpx.txt"""
+        run_id, meta = queue.get_latest_run('httpx')
+        if not run_id:
+            self.logger.error("No unmerged httpx run found in queue")
+            return False
+        
+        counts = queue.get_counts('httpx', run_id)
+        if counts.get('pending') or counts.get('running'):
+            self.logger.error(f"Run {run_id} is not finished yet: {counts}")
             return False
+        
+        jobs_by_file = {}
+        for job in queue.get_jobs(run_id):
+            # Run lama belum punya id file dan dikelompokkan per base name
+            jobs_by_file.setdefault(job['payload'].get('file', job['payload']['base']), []).append(job)
+        
+        merged_count = 0
+        for file_id, file_meta in meta['files'].items():
+            base_name = file_meta.get('base', file_id)
+            outputs = []
+            partial = False
+            for job in sorted(jobs_by_file.get(file_id, []), key=lambda job: job['key']):
+                if job['status'] != 'done' or (job['result'] or {}).get('partial'):
+                    partial = True
+                output_path = job['payload']['output']
+                if job['status'] == 'done' and os.path.exists(output_path):
+                    with open(output_path, 'r', encoding='utf-8') as f:
+                        content = f.read().strip()
+                    if content:
+                        outputs.append(content)
+            
+            if not outputs:
+                self.logger.warning(f"No results from bulk httpx for file: {file_meta['source_file']}")
+                continue
+            
+            output_file = os.path.join(self.output_dir, f"{base_name}-httpx.txt")
+            self.process_bulk_output(file_meta['source_file'], output_file, '\n'.join(outputs), partial=partial)
+            merged_count += 1
+        
+        queue.mark_merged(run_id)
+        shutil.rmtree(queue.get_parts_dir(run_id), ignore_errors=True)
+        self.logger.info(f"Merged run {run_id}: {merged_count} files")
+        return True
+    
+    def run_bulk_files(self, input_files: list) -> int:
+        """Jalankan bulk httpx untuk banyak file.
+
+        Pass utama melewati file yang timeout pada run sebelumnya; file tersebut
+        dijalankan sekali setelah pass utama (bukan retry, sama seperti job yang
+        ditunda di mode queue). File yang timeout lalu di-retry maksimal
+        max_retries ronde dengan backoff. File yang gagal karena sebab lain
+        tidak di-retry. Return jumlah file yang berhasil diproses.
+        """
+        processed_count = 0
+        deferred_files = []
+        retry_files = []
+        
+        for input_file in input_files:
+            if self.timeouts.is_slow(self.get_file_key(input_file)):
+                self.logger.info(f"Deferring known-slow file: {input_file}")
+                deferred_files.append(input_file)
+                continue
+            
+            self.logger.info(f"Processing file: {input_file}")
+            if self.run_bulk_file_once(input_file, retry_files):
+                processed_count += 1
+        
+        # Pass prioritas rendah untuk file yang dikenal lambat, dengan budget biasa
+        for input_file in deferred_files:
+            self.logger.info(f"Processing deferred file: {input_file}")
+            if self.run_bulk_file_once(input_file, retry_files):
+                processed_count += 1
+        
+        if retry_files:
+            self.logger.info(f"Retry pass for {len(retry_files)} slow or timed out files")
+            processed_count += self.retry_bulk_files(retry_files)
+        
+        self.timeouts.save()
+        return processed_count
+    
+    def run_bulk_file_once(self, input_file: str, retry_files: list) -> bool:
+        """Jalankan satu file dengan budget biasa; file yang timeout ditambahkan ke
+        retry_files, atau disimpan hasil parsialnya jika retry tidak diizinkan"""
+        if self.run_httpx_bulk_file(input_file, keep_partial=not self.max_retries):
+            self.logger.info(f"Successfully processed: {os.path.basename(input_file)}")
+            return True
+        if self.last_failure.get(self.get_file_key(input_file)) == 'timeout' and self.max_retries:
+            retry_files.append(input_file)
+        else:
+            self.logger.error(f"Failed to process: {os.path.basename(input_file)}")
+        return False
+    
+    def retry_bulk_files(self, input_files: list) -> int:
+        """Retry bulk httpx per ronde dengan backoff; ronde terakhir menyimpan hasil parsial.
+        
+        Backoff dijalankan sekali per ronde untuk semua file yang masih pending.
+        Return jumlah file yang berhasil diproses.
+        """
+        processed_count = 0
+        pending = list(input_files)
+        
+        for attempt in range(1, self.max_retries + 1):
+            if not pending:
+                break
+            
+            delay = self.timeouts.get_retry_delay(attempt)
+            if delay:
+                self.logger.info(f"Retry round {attempt} for {len(pending)} files in {delay:.0f}s")
+                time.sleep(delay)
+            
+            last_round = attempt == self.max_retries
+            still_pending = []
+            for input_file in pending:
+                base_name = self.get_file_key(input_file)
+                timeout = self.timeouts.get_retry_timeout(base_name, attempt, self.count_lines(input_file))
+                if self.run_httpx_bulk_file(input_file, timeout=timeout, keep_partial=last_round):
+                    processed_count += 1
+                    self.logger.info(f"Successfully processed on retry: {os.path.basename(input_file)}")
+                elif self.last_failure.get(base_name) == 'timeout' and not last_round:
+                    still_pending.append(input_file)
+                else:
+                    # Gagal bukan karena timeout (retry tidak akan membantu) atau retry habis
+                    self.logger.error(f"Failed to process after retries: {os.path.basename(input_file)}")
+            pending = still_pending
+        
+        return processed_count
+    
+    def get_file_key(self, input_file: str) -> str:
+        """Key latency/output untuk file input: nama file tanpa ekstensi"""
+        return os.path.splitext(os.path.basename(input_file))[0]
+    
+    def count_lines(self, input_file: str) -> int:
+        """Hitung jumlah baris file input"""
+        with open(input_file, 'rb') as f:
+            return sum(1 for line in f if line.strip())
+    
+    def process_bulk_output(self, input_file: str, output_file: str, output: str, partial: bool = False):
+        """Simpan output bulk httpx, update fingerprint store dan catat perubahan.
+
+        Untuk output parsial, hasil lama dari URL yang belum sempat di-probe
+        dipertahankan supaya tidak terhitung sebagai URL yang hilang.
+        """
+        base_name = os.path.basename(output_file).replace('-httpx.txt', '')
+        
+        # Fingerprint dari run sebelumnya, harus dibaca sebelum output ditimpa.
+        # File hasil tanpa fingerprint store dibuat sebelum -cl dipakai.
+        legacy_output = not os.path.exists(self.get_fingerprint_path(base_name))
+        # Belum ada state sama sekali: run pertama hanya menjadi baseline
+        baseline = legacy_output and not os.path.exists(output_file)
+        previous = self.load_fingerprints(base_name, output_file)
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        
+        carried_urls = set()
+        if partial and os.path.exists(output_file):
+            probed_urls = set()
+            for line in output.split('\n'):
+                parsed = self.parse_httpx_line(line)
+                if parsed:
+                    probed_urls.add(parsed['url'])
+            
+            carried_lines = []
+            with open(output_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parsed = self.parse_httpx_line(line, content_length=not legacy_output)
+                    if parsed and parsed['url'] not in probed_urls:
+                        carried_urls.add(parsed['url'])
+                        if legacy_output:
+                            # Baris file lama tanpa -cl ditulis ulang dalam format -cl
+                            # dengan content length kosong
+                            carried_lines.append(self.format_httpx_line(parsed))
+                        else:
+                            carried_lines.append(line.rstrip('\n'))
+            if carried_lines:
+                output = output + '\n' + '\n'.join(carried_lines)
+        
+        # Simpan hasil langsung ke file output
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        
+        self.logger.info(f"Bulk httpx completed. Results saved to: {output_file}")
+        
+        results = {}
+        for line in output.split('\n'):
+            parsed = self.parse_httpx_line(line)
+            if parsed:
+                results[parsed['url']] = parsed
+        
+        current = {url: self.build_fingerprint(parsed) for url, parsed in results.items()}
+        if partial:
+            # URL yang belum sempat di-probe tidak dihitung sebagai removed dan
+            # fingerprint lamanya (termasuk penanda legacy) dipertahankan
+            for url, fingerprint in previous.items():
+                if url in carried_urls or url not in current:
+                    current[url] = fingerprint
+        changes = self.diff_fingerprints(previous, current, results)
+        # Semua URL tetap dicatat sebagai URL baru di scan generation (/api/changes)
+        added_results = [results[entry['url']] for entry in changes['added']]
+        if baseline:
+            # Change set run pertama dikosongkan, bukan berisi seluruh file
+            changes.update({'baseline': True, 'added': [], 'changed': [], 'removed': []})
+        self.save_fingerprints(base_name, current)
+        self.save_changes(base_name, changes)
+        
+        self.record_generation(base_name, input_file, output_file, added_results)
+    
+    def split_httpx_line(self, line: str):
+        """Pecah satu baris output httpx jadi field; None untuk baris kosong/header"""
+        line = line.strip()
+        if not line or line.startswith('URL'):
+            return None
+        
+        parts = [part.replace(']', '').strip() for part in line.split(' [')]
+        if len(parts) < 3:
+            return None
+        return parts
+    
+    def has_content_length(self, lines) -> bool:
+        """Tebak apakah output httpx dibuat dengan -cl (untuk input mode --parse).
+        
+        Dalam satu baris, content length tidak bisa dibedakan dari title numeric
+        (mis. [404]), jadi format ditebak per input: output -cl selalu punya
+        angka setelah status code di setiap baris. Mode --parse hanya memberi
+        potongan awal input (PARSE_SNIFF_LINES) supaya stdin tetap diproses
+        streaming. File hasil runner sendiri tidak perlu ditebak: file yang
+        punya fingerprint store selalu -cl.
+        """
+        for line in lines:
+            parts = self.split_httpx_line(line)
+            if parts and not (parts[2].isdigit() or parts[2] == ''):
+                return False
+        return True
+    
+    def parse_httpx_line(self, line: str, content_length: bool = True):
+        """Parse satu baris output httpx: https://example.com [200] [1234] [Title] [Tech]
+        
+        content_length=False untuk file hasil lama yang dibuat tanpa -cl.
+        """
+        parts = self.split_httpx_line(line)
+        if parts is None:
+            return None
+        
+        length = None
+        fields = parts[2:]
+        if content_length and fields[0].isdigit():
+            length = int(fields[0])
+            fields = fields[1:]
+        elif content_length and fields[0] == '' and len(fields) > 1:
+            # Content length kosong: baris yang dibawa dari file hasil lama tanpa -cl
+            fields = fields[1:]
+        
+        return {
+            'url': parts[0],
+            'status_code': parts[1],
+            'content_length': length,
+            'title': fields[0] if len(fields) > 0 else "",
+            'tech': fields[1] if len(fields) > 1 else ""
+        }
+    
+    def format_httpx_line(self, parsed: dict) -> str:
+        """Tulis ulang hasil parse ke format output httpx -cl"""
+        length = '' if parsed['content_length'] is None else parsed['content_length']
+        line = f"{parsed['url']} [{parsed['status_code']}] [{length}] [{parsed['title']}]"
+        if parsed['tech']:
+            line += f" [{parsed['tech']}]"
+        return line
+    
+    def build_fingerprint(self, parsed: dict) -> dict:
+        """Fingerprint ringkas satu URL: status, hash title, set tech, content length.
+        
+        Nama tech disimpan lowercase, sama seperti index tech di dashboard:
+        Nginx dan nginx adalah tech yang sama.
+        """
+        return {
+            'status_code': parsed['status_code'],
+            'title_hash': hashlib.sha1(parsed['title'].encode('utf-8')).hexdigest()[:16],
+            'tech': sorted({t.strip().lower() for t in parsed['tech'].split(',') if t.strip()}),
+            'content_length': parsed['content_length']
+        }
+    
+    def get_fingerprint_path(self, base_name: str) -> str:
+        """Path fingerprint store untuk satu file hasil"""
+        return os.path.join(self.output_dir, '.fingerprints', f"{base_name}.json")
+    
+    def load_fingerprints(self, base_name: str, output_file: str) -> dict:
+        """Load fingerprint run sebelumnya; fallback ke file hasil lama jika store belum ada.
+        
+        File hasil lama dibuat tanpa -cl dan title numeric di dalamnya tidak bisa
+        dibedakan dari content length, jadi fingerprint hasil seeding ditandai
+        legacy dan hanya status code-nya yang dibandingkan.
+        """
+        path = self.get_fingerprint_path(base_name)
+        try:
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    fingerprints = json.load(f)
+                # Store lama menyimpan nama tech dengan casing aslinya
+                for fingerprint in fingerprints.values():
+                    fingerprint['tech'] = sorted({t.lower() for t in fingerprint.get('tech', [])})
+                return fingerprints
+            
+            fingerprints = {}
+            if os.path.exists(output_file):
+                with open(output_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        parsed = self.parse_httpx_line(line, content_length=False)
+                        if parsed:
+                            fingerprint = self.build_fingerprint(parsed)
+                            fingerprint['legacy'] = True
+                            fingerprints[parsed['url']] = fingerprint
+            return fingerprints
         except Exception as e:
-            self.logger.error(f"Error running bulk httpx for file {input_file}: {e}")
+            self.logger.warning(f"Error loading fingerprints for {base_name}: {e}")
+            return {}
+    
+    def save_fingerprints(self, base_name: str, fingerprints: dict):
+        """Simpan fingerprint store secara atomic"""
+        path = self.get_fingerprint_path(base_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(fingerprints, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.logger.error(f"Error saving fingerprints for {base_name}: {e}")
+    
+    def diff_fingerprints(self, previous: dict, current: dict, results: dict) -> dict:
+        """Bandingkan fingerprint dua run dan hasilkan change set ringkas"""
+        added = []
+        changed = []
+        for url, fingerprint in current.items():
+            before = previous.get(url)
+            if before is None:
+                added.append({'url': url, 'status_code': fingerprint['status_code'], 'title': results[url]['title']})
+                continue
+            
+            fields = [field for field in fingerprint if before.get(field) != fingerprint[field]]
+            if before.get('legacy'):
+                # Seeding dari file hasil lama: title/tech/content length tidak bisa dipercaya
+                fields = [field for field in fields if field == 'status_code']
+            if 'content_length' in fields and not self.content_length_changed(before.get('content_length'),
+                                                                              fingerprint['content_length']):
+                fields.remove('content_length')
+            if fields:
+                changed.append({
+                    'url': url,
+                    'fields': fields,
+                    'before': {field: before.get(field) for field in fields},
+                    'after': {field: fingerprint[field] for field in fields},
+                    'title': results[url]['title']
+                })
+        
+        removed = [{'url': url, 'status_code': before.get('status_code')}
+                   for url, before in previous.items() if url not in current]
+        
+        return {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'total': len(current),
+            'baseline': False,
+            'added': added,
+            'changed': changed,
+            'removed': removed
+        }
+    
+    def content_length_changed(self, before, after) -> bool:
+        """Perubahan content length dihitung hanya jika selisihnya signifikan"""
+        # Hasil lama tanpa -cl tidak bisa dibandingkan
+        if before is None or after is None:
             return False
+        return abs(after - before) > max(before, after) * CONTENT_LENGTH_TOLERANCE
+    
+    def save_changes(self, base_name: str, changes: dict):
+        """Simpan change set ke {base}-changes.json"""
+        path = os.path.join(self.output_dir, f"{base_name}-changes.json")
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(changes, f, indent=2)
+            if changes.get('baseline'):
+                self.logger.info(f"Baseline for {base_name}: {changes['total']} URLs, changes are reported from the next run")
+            else:
+                self.logger.info(f"Changes for {base_name}: {len(changes['added'])} added, "
+                                 f"{len(changes['changed'])} changed, {len(changes['removed'])} removed")
+        except Exception as e:
+            self.logger.error(f"Error saving changes for {base_name}: {e}")
+    
+    def record_generation(self, program_name: str, input_file: str, output_file: str, added_results: list):
+        """Catat satu scan generation beserta URL yang baru muncul di run ini.
+        
+        Penulisan dilakukan di bawah lock supaya generation ter-commit sesuai
+        urutan id-nya; /api/changes memakai MAX(id) sebagai cursor.
+        """
+        try:
+            if not self.db.connect():
+                self.logger.error("Failed to connect to database, scan generation not recorded")
+                return None
+            
+            cursor = self.db.connection.cursor()
+            ensure_generation_tables(cursor)
+            if not acquire_generation_lock(cursor):
+                self.logger.error(f"Timed out waiting for generation lock, scan generation for {program_name} not recorded")
+                cursor.close()
+                self.db.disconnect()
+                return None
+            
+            try:
+                cursor.execute(
+                    "INSERT INTO httpx_generations (program, source_file, result_file, added_count) VALUES (%s, %s, %s, %s)",
+                    (program_name, input_file, output_file, len(added_results))
+                )
+                generation_id = cursor.lastrowid
+                if added_results:
+                    cursor.executemany(
+                        "INSERT INTO httpx_changes (generation_id, url, status_code, title, tech) VALUES (%s, %s, %s, %s, %s)",
+                        [(generation_id, r['url'], r['status_code'], r['title'], r['tech']) for r in added_results]
+                    )
+                self.db.connection.commit()
+            finally:
+                release_generation_lock(cursor)
+            cursor.close()
+            self.db.disconnect()
+            
+            self.logger.info(f"Recorded scan generation {generation_id} for {program_name}: {len(added_results)} new URLs")
+            return generation_id
+        except Exception as e:
+            self.logger.error(f"Error recording scan generation for {program_name}: {e}")
+            return None
     
     def save_results(self, results: list, program_name: str):
         """Simpan hasil ke file dengan pola penamaan yang konsisten"""
@@ -162,6 +739,7 @@ class HTTPXRunner:
         filepath = os.path.join(self.output_dir, filename)
         
         try:
+            os.makedirs(self.output_dir, exist_ok=True)
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write("URL\tStatus Code\tTitle\tTech Detected\tSubdomain\n")
                 for result in results:
@@ -184,17 +762,54 @@ class HTTPXRunner:
         # Group subdomains by program untuk organized output
         programs_results = self.group_subdomains_by_program(subdomains)
         
-        total_results = 0
+        results_by_program = {}
+        deferred_subdomains = []
+        retry_subdomains = []
         for program_name, program_subdomains in programs_results.items():
-            program_results = []
+            program_results = results_by_program.setdefault(program_name, [])
             for subdomain in program_subdomains:
+                # Subdomain yang dikenal lambat tidak menahan pass utama
+                if self.subdomain_timeouts.is_slow(subdomain):
+                    deferred_subdomains.append((program_name, subdomain))
+                    continue
+                
                 result = self.run_httpx(subdomain)
                 if result:
                     program_results.append(result)
+                elif self.subdomain_timeouts.is_slow(subdomain):
+                    retry_subdomains.append((program_name, subdomain))
+        
+        # Subdomain yang ditunda dijalankan sekali dengan budget biasa (bukan retry)
+        for program_name, subdomain in deferred_subdomains:
+            result = self.run_httpx(subdomain)
+            if result:
+                results_by_program[program_name].append(result)
+            elif self.subdomain_timeouts.is_slow(subdomain):
+                retry_subdomains.append((program_name, subdomain))
+        
+        # Pass retry prioritas rendah untuk subdomain yang timeout, backoff sekali per ronde
+        for attempt in range(1, self.max_retries + 1):
+            if not retry_subdomains:
+                break
+            delay = self.subdomain_timeouts.get_retry_delay(attempt)
+            if delay:
+                time.sleep(delay)
             
+            still_pending = []
+            for program_name, subdomain in retry_subdomains:
+                result = self.run_httpx(subdomain, timeout=self.subdomain_timeouts.get_retry_timeout(subdomain, attempt))
+                if result:
+                    results_by_program[program_name].append(result)
+                elif self.subdomain_timeouts.is_slow(subdomain):
+                    still_pending.append((program_name, subdomain))
+            retry_subdomains = still_pending
+        
+        total_results = 0
+        for program_name, program_results in results_by_program.items():
             self.save_results(program_results, program_name)
             total_results += len(program_results)
         
+        self.subdomain_timeouts.save()
         self.logger.info(f"HTTPX scanning completed. Total results found: {total_results}")
     
     def group_subdomains_by_program(self, subdomains: list):
@@ -224,36 +839,116 @@ class HTTPXRunner:
             self.logger.warning(f"Error extracting program name from {subdomain}: {e}")
             return "unknown"
 
+def parse_args():
+    """Parse argument command line"""
+    parser = argparse.ArgumentParser(description="Bulk httpx runner untuk semua file .txt di scout/scans")
+    parser.add_argument('--max-retries', type=int, default=2,
+                        help='Jumlah retry untuk file yang lambat/timeout di pass retry (default: 2)')
+    parser.add_argument('--retry-backoff', type=float, default=30,
+                        help='Delay awal exponential backoff antar retry dalam detik (default: 30)')
+    
+    parser.add_argument('--parse', nargs='*', metavar='FILE',
+                        help='Mode offline: parse output httpx dari FILE (atau stdin) jadi JSON lines tanpa database')
+    parser.add_argument('--content-length', action=argparse.BooleanOptionalAction, default=None,
+                        help='Untuk --parse: input dibuat dengan/tanpa httpx -cl '
+                             f'(default: ditebak dari {PARSE_SNIFF_LINES} baris pertama)')
+    
+    distributed = parser.add_argument_group('distributed mode')
+    mode = distributed.add_mutually_exclusive_group()
+    mode.add_argument('--coordinator', action='store_true',
+                      help='Pecah file input jadi shard ke queue (lalu jalankan --local-workers jika diisi)')
+    mode.add_argument('--worker', action='store_true',
+                      help='Ambil dan proses shard httpx dari queue sampai habis')
+    mode.add_argument('--merge', action='store_true',
+                      help='Gabungkan hasil worker ke scans/httpx')
+    distributed.add_argument('--queue', default='scans/queue.db',
+                             help='Path file queue SQLite di shared volume (default: scans/queue.db)')
+    distributed.add_argument('--shard-size', type=int, default=5000,
+                             help='Jumlah URL per shard (default: 5000)')
+    distributed.add_argument('--local-workers', type=int, default=0,
+                             help='Dengan --coordinator: jalankan N worker lokal lalu merge hasilnya')
+    return parser.parse_args()
+
+def run_local_workers(args, count: int) -> bool:
+    """Jalankan N proses worker lokal dan tunggu semuanya selesai"""
+    logger = logging.getLogger(__name__)
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', '--queue', args.queue,
+           '--max-retries', str(args.max_retries), '--retry-backoff', str(args.retry_backoff)]
+    workers = [subprocess.Popen(cmd) for _ in range(count)]
+    logger.info(f"Started {count} local httpx workers")
+    return all(worker.wait() == 0 for worker in workers)
+
+def find_input_files(scout_scans_path: str) -> list:
+    """Find all .txt files in scout/scans directory"""
+    input_files = []
+    for root, dirs, files in os.walk(scout_scans_path):
+        for file in files:
+            if file.endswith('.txt'):
+                input_files.append(os.path.join(root, file))
+    return input_files
+
 def main():
     """Main entry point - automatically scan all .txt files in scout/scans directory"""
+    args = parse_args()
+    
+    if args.parse is not None:
+        setup_logging(offline=True)
+        runner = HTTPXRunner()
+        try:
+            lines = read_input_lines(args.parse)
+            content_length = args.content_length
+            if content_length is None:
+                head = list(itertools.islice(lines, PARSE_SNIFF_LINES))
+                content_length = runner.has_content_length(head)
+                lines = itertools.chain(head, lines)
+            for line in lines:
+                parsed = runner.parse_httpx_line(line, content_length)
+                if parsed:
+                    print(json.dumps(parsed))
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # Pembaca output berhenti lebih dulu (mis. | head): buang sisa output tanpa traceback
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
+        except OSError as e:
+            logging.getLogger(__name__).error(f"Cannot read input: {e}")
+            sys.exit(1)
+        return
+    
     setup_logging()
     logger = logging.getLogger(__name__)
     
     # Path to scout/scans directory
     scout_scans_path = os.path.join(os.path.dirname(__file__), '..', 'scout', 'scans')
     
-    if not os.path.exists(scout_scans_path):
+    if not (args.worker or args.merge) and not os.path.exists(scout_scans_path):
         logger.error(f"Scout scans directory not found: {scout_scans_path}")
         sys.exit(1)
     
     try:
-        runner = HTTPXRunner()
-        processed_count = 0
+        runner = HTTPXRunner(max_retries=args.max_retries, retry_backoff=args.retry_backoff)
         
-        # Find all .txt files in scout/scans directory
-        for root, dirs, files in os.walk(scout_scans_path):
-            for file in files:
-                if file.endswith('.txt'):
-                    input_file = os.path.join(root, file)
-                    logger.info(f"Processing file: {input_file}")
-                    
-                    # Process file with bulk httpx
-                    success = runner.run_httpx_bulk_file(input_file)
-                    if success:
-                        processed_count += 1
-                        logger.info(f"Successfully processed: {file}")
-                    else:
-                        logger.error(f"Failed to process: {file}")
+        if args.coordinator or args.worker or args.merge:
+            from work_queue import WorkQueue
+            
+            # Satu attempt untuk pass utama, sisanya untuk retry
+            queue = WorkQueue(args.queue, max_attempts=args.max_retries + 1)
+            
+            if args.coordinator:
+                runner.enqueue_files(queue, find_input_files(scout_scans_path), args.shard_size)
+                if args.local_workers > 0:
+                    if not run_local_workers(args, args.local_workers):
+                        logger.warning("Some local workers exited with an error")
+                    runner.merge_queue_results(queue)
+            elif args.worker:
+                runner.run_worker(queue)
+            else:
+                if not runner.merge_queue_results(queue):
+                    sys.exit(1)
+            return
+        
+        # Process files with bulk httpx
+        processed_count = runner.run_bulk_files(find_input_files(scout_scans_path))
         
         logger.info(f"Bulk httpx processing completed. Processed {processed_count} files.")
         
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Runner Common for S.C.O.U.T support
+Helper bersama run-gau.py dan run-httpx.py: akses database scout, logging dan input mode offline
+"""
+
+import os
+import sys
+import logging
+
+# Scout project directory, added to sys.path only when the database is needed
+SCOUT_PROJECT_PATH = os.path.join(os.path.dirname(__file__), '..', 'scout')
+
+def load_database():
+    """Import src.db dari project scout dan buat Database saat pertama kali dibutuhkan"""
+    if SCOUT_PROJECT_PATH not in sys.path:
+        sys.path.append(SCOUT_PROJECT_PATH)
+    from src.db import Database
+    return Database(config_path=os.path.join(SCOUT_PROJECT_PATH, 'config.json'))
+
+def setup_logging(offline: bool = False):
+    """Setup basic logging configuration"""
+    if offline:
+        # Mode filter: stdout khusus untuk hasil, log hanya warning ke stderr
+        logging.basicConfig(
+            level=logging.WARNING,
+            format='%(levelname)s - %(message)s',
+            handlers=[logging.StreamHandler(sys.stderr)]
+        )
+        return
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('scout.log'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+def read_input_lines(paths: list):
+    """Baca baris non-kosong dari file, atau dari stdin jika tidak ada file"""
+    if not paths:
+        for line in sys.stdin:
+            if line.strip():
+                yield line.strip()
+        return
+    
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if line.strip():
+                    yield line.strip()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Scan Generations for S.C.O.U.T support
+Skema log scan generation httpx, dipakai bersama oleh run-httpx.py dan dashboard
+"""
+
+# Lock MySQL (GET_LOCK) yang menserialisasi penulisan generation, supaya id
+# generation ter-commit berurutan dan MAX(id) aman dipakai sebagai cursor
+GENERATION_LOCK = 'scout_httpx_generations'
+GENERATION_LOCK_TIMEOUT = 60
+
+def ensure_generation_tables(cursor):
+    """Buat tabel log scan generation dan hasil httpx baru jika belum ada"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS httpx_generations (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            program VARCHAR(255) NOT NULL,
+            source_file VARCHAR(1024) NOT NULL,
+            result_file VARCHAR(1024) NOT NULL,
+            added_count INT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS httpx_changes (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            generation_id INT NOT NULL,
+            url TEXT NOT NULL,
+            status_code VARCHAR(16),
+            title TEXT,
+            tech TEXT,
+            INDEX idx_generation (generation_id)
+        )
+    """)
+
+def acquire_generation_lock(cursor) -> bool:
+    """Ambil lock penulisan generation; False jika timeout"""
+    cursor.execute("SELECT GET_LOCK(%s, %s)", (GENERATION_LOCK, GENERATION_LOCK_TIMEOUT))
+    return cursor.fetchone()[0] == 1
+
+def release_generation_lock(cursor):
+    """Lepas lock penulisan generation"""
+    cursor.execute("SELECT RELEASE_LOCK(%s)", (GENERATION_LOCK,))
+    cursor.fetchone()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Work Queue for S.C.O.U.T support runners
+Queue pekerjaan berbasis SQLite di shared volume untuk mode scan terdistribusi
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import logging
+
+class DeferredJob(Exception):
+    """Raise dari handler untuk menunda job sekali tanpa menghitungnya sebagai attempt"""
+
+class WorkQueue:
+    """Queue shard pekerjaan (domain gau / potongan file httpx) yang di-claim oleh worker
+
+    Claim dilakukan di dalam transaksi BEGIN IMMEDIATE sehingga aman dipakai
+    banyak proses/node sekaligus. Job yang worker-nya mati bisa di-claim ulang
+    setelah lease habis. Job yang gagal dikembalikan ke antrian dengan prioritas
+    lebih rendah (diurutkan berdasarkan jumlah attempt) dan baru bisa di-claim
+    lagi setelah delay backoff-nya lewat (kolom not_before). Job yang ditunda
+    (DeferredJob) tidak menghabiskan attempt, tapi diurutkan di belakang job baru.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 4 * 3600, max_attempts: int = 3):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.ensure_schema()
+
+    def connect(self):
+        """Buka koneksi SQLite dengan autocommit; transaksi diatur manual"""
+        # Journal mode default (bukan WAL) supaya tetap aman di network filesystem
+        connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def ensure_schema(self):
+        """Buat tabel runs dan jobs jika belum ada"""
+        connection = self.connect()
+        try:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    meta TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    merged_at REAL
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    leased_at REAL,
+                    not_before REAL,
+                    deferred INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    UNIQUE (run_id, key)
+                )
+            """)
+            # Queue lama dibuat sebelum ada backoff antar attempt dan penundaan job
+            columns = [row['name'] for row in connection.execute("PRAGMA table_info(jobs)")]
+            if 'not_before' not in columns:
+                connection.execute("ALTER TABLE jobs ADD COLUMN not_before REAL")
+            if 'deferred' not in columns:
+                connection.execute("ALTER TABLE jobs ADD COLUMN deferred INTEGER NOT NULL DEFAULT 0")
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (kind, status, attempts, id)")
+        finally:
+            connection.close()
+
+    def new_run_id(self, kind: str) -> str:
+        """Buat run id unik untuk satu jenis pekerjaan"""
+        return f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+    def create_run(self, kind: str, meta: dict, jobs: list, run_id: str = None) -> str:
+        """Daftarkan run baru beserta job-nya; jobs berupa list (key, payload)"""
+        run_id = run_id or self.new_run_id(kind)
+        connection = self.connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT INTO runs (run_id, kind, meta, created_at) VALUES (?, ?, ?, ?)",
+                (run_id, kind, json.dumps(meta), time.time())
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO jobs (run_id, kind, key, payload) VALUES (?, ?, ?, ?)",
+                [(run_id, kind, key, json.dumps(payload)) for key, payload in jobs]
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+        self.logger.info(f"Created run {run_id} with {len(jobs)} {kind} jobs")
+        return run_id
+
+    def get_latest_run(self, kind: str):
+        """Ambil run terbaru yang belum di-merge untuk satu jenis pekerjaan"""
+        connection = self.connect()
+        try:
+            row = connection.execute(
+                "SELECT run_id, meta FROM runs WHERE kind = ? AND merged_at IS NULL ORDER BY created_at DESC LIMIT 1",
+                (kind,)
+            ).fetchone()
+            if not row:
+                return None, None
+            return row['run_id'], json.loads(row['meta'])
+        finally:
+            connection.close()
+
+    def mark_merged(self, run_id: str):
+        """Tandai run sudah di-merge ke layout output biasa"""
+        connection = self.connect()
+        try:
+            connection.execute("UPDATE runs SET merged_at = ? WHERE run_id = ?", (time.time(), run_id))
+        finally:
+            connection.close()
+
+    def claim(self, kind: str):
+        """Claim satu job pending yang delay backoff-nya sudah lewat (atau job dengan
+        lease kadaluarsa); None jika tidak ada"""
+        now = time.time()
+        connection = self.connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute("""
+                SELECT id, run_id, key, payload, attempts, deferred FROM jobs
+                WHERE kind = ?
+                  AND ((status = 'pending' AND (not_before IS NULL OR not_before <= ?))
+                       OR (status = 'running' AND leased_at < ?))
+                ORDER BY attempts + deferred, id
+                LIMIT 1
+            """, (kind, now, now - self.lease_seconds)).fetchone()
+
+            if not row:
+                connection.execute("COMMIT")
+                return None
+
+            connection.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, leased_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (self.worker_id, now, row['id'])
+            )
+            connection.execute("COMMIT")
+            return {
+                'id': row['id'],
+                'run_id': row['run_id'],
+                'key': row['key'],
+                'payload': json.loads(row['payload']),
+                'attempts': row['attempts'] + 1,
+                'deferred': bool(row['deferred'])
+            }
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def complete(self, job_id: int, result: dict = None):
+        """Tandai job selesai"""
+        connection = self.connect()
+        try:
+            connection.execute(
+                "UPDATE jobs SET status = 'done', result = ? WHERE id = ?",
+                (json.dumps(result or {}), job_id)
+            )
+        finally:
+            connection.close()
+
+    def fail(self, job_id: int, attempts: int, error: str, delay: float = 0):
+        """Kembalikan job ke antrian (baru bisa di-claim setelah delay detik),
+        atau tandai failed jika attempt sudah habis"""
+        status = 'failed' if attempts >= self.max_attempts else 'pending'
+        connection = self.connect()
+        try:
+            connection.execute(
+                "UPDATE jobs SET status = ?, result = ?, not_before = ? WHERE id = ?",
+                (status, json.dumps({'error': error}), time.time() + delay, job_id)
+            )
+        finally:
+            connection.close()
+
+    def release(self, job_id: int):
+        """Kembalikan job yang sedang dikerjakan ke antrian tanpa menghitung attempt-nya"""
+        connection = self.connect()
+        try:
+            connection.execute(
+                "UPDATE jobs SET status = 'pending', worker = NULL, leased_at = NULL, attempts = attempts - 1 "
+                "WHERE id = ? AND status = 'running'",
+                (job_id,)
+            )
+        finally:
+            connection.close()
+
+    def defer(self, job_id: int):
+        """Kembalikan job ke antrian di belakang job baru, tanpa menghitung attempt-nya"""
+        connection = self.connect()
+        try:
+            connection.execute(
+                "UPDATE jobs SET status = 'pending', worker = NULL, leased_at = NULL, attempts = attempts - 1, "
+                "deferred = 1 WHERE id = ? AND status = 'running'",
+                (job_id,)
+            )
+        finally:
+            connection.close()
+
+    def is_last_attempt(self, job: dict) -> bool:
+        """Cek apakah job sedang di attempt terakhirnya"""
+        return job['attempts'] >= self.max_attempts
+
+    def get_counts(self, kind: str = None, run_id: str = None) -> dict:
+        """Jumlah job per status"""
+        query = "SELECT status, COUNT(*) as count FROM jobs WHERE 1 = 1"
+        params = []
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        if run_id:
+            query += " AND run_id = ?"
+            params.append(run_id)
+        query += " GROUP BY status"
+
+        connection = self.connect()
+        try:
+            return {row['status']: row['count'] for row in connection.execute(query, params)}
+        finally:
+            connection.close()
+
+    def get_parts_dir(self, run_id: str) -> str:
+        """Direktori file parsial satu run, di samping file queue (shared volume)"""
+        return os.path.join(os.path.dirname(os.path.abspath(self.path)), 'parts', run_id)
+
+    def get_jobs(self, run_id: str, status: str = None) -> list:
+        """Ambil semua job dari satu run"""
+        query = "SELECT id, key, payload, status, result FROM jobs WHERE run_id = ?"
+        params = [run_id]
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY id"
+
+        connection = self.connect()
+        try:
+            return [{
+                'id': row['id'],
+                'key': row['key'],
+                'payload': json.loads(row['payload']),
+                'status': row['status'],
+                'result': json.loads(row['result']) if row['result'] else None
+            } for row in connection.execute(query, params)]
+        finally:
+            connection.close()
+
+    def work(self, kind: str, handler, poll_interval: float = 5, retry_delay=None) -> int:
+        """Loop worker: claim dan proses job sampai antrian kosong.
+
+        handler(job) mengembalikan dict result jika sukses, raise DeferredJob
+        untuk menunda job sekali, atau raise exception lain jika gagal. retry_delay(attempts) menentukan delay backoff
+        sebelum job yang gagal boleh di-claim lagi. Worker tetap menunggu
+        selama masih ada job running di worker lain (bisa kembali ke antrian)
+        atau job pending yang delay backoff-nya belum lewat.
+        """
+        processed = 0
+        while True:
+            job = self.claim(kind)
+            if job is None:
+                counts = self.get_counts(kind)
+                if not counts.get('running') and not counts.get('pending'):
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            try:
+                result = handler(job)
+                self.complete(job['id'], result)
+                processed += 1
+            except DeferredJob as e:
+                self.logger.info(f"Job {job['key']} deferred: {e}")
+                self.defer(job['id'])
+            except Exception as e:
+                self.logger.error(f"Job {job['key']} failed (attempt {job['attempts']}): {e}")
+                delay = retry_delay(job['attempts']) if retry_delay else 0
+                self.fail(job['id'], job['attempts'], str(e), delay)
+            except BaseException:
+                # Worker dihentikan (Ctrl+C, tool tidak terinstall): job dikembalikan utuh
+                self.release(job['id'])
+                raise
+
+        self.logger.info(f"Worker {self.worker_id} finished: {processed} {kind} jobs processed")
+        return processed